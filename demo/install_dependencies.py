@@ -5,12 +5,16 @@ This script installs all required dependencies in the correct order
 to avoid common installation issues.
 """
 
+import hashlib
 import subprocess
 import sys
 import os
 import time
 from pathlib import Path
 
+# Stamp recording what was last installed into this interpreter's environment
+INSTALL_STAMP = Path(sys.prefix) / ".orpheus_install_hash"
+
 def print_step(step, message):
     """Print a nicely formatted step message"""
     print(f"\n{'='*80}")
@@ -53,38 +57,59 @@ def run_pip_install(packages, timeout=300, description=""):
         print(f"❌ Unexpected error: {e}")
         return False
 
+def compute_install_hash(paths):
+    """Hash the installer and requirements files so unchanged setups can be skipped"""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(str(path).encode())
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
 def main():
     """Main installation function"""
     demo_dir = Path(__file__).parent
     repo_root = demo_dir.parent
+    req_file = repo_root / "requirements.txt"
     
+    install_hash = compute_install_hash([Path(__file__).resolve(), req_file])
+    if "--force" not in sys.argv and INSTALL_STAMP.exists() and INSTALL_STAMP.read_text().strip() == install_hash:
+        print("✅ Dependencies already installed and requirements unchanged (use --force to reinstall)")
+        return
+    
+    results = []
     print_step(1, "Installing build dependencies")
-    run_pip_install("pip --upgrade", description="Upgrading pip")
-    run_pip_install("setuptools wheel --upgrade", description="Installing build tools")
-    run_pip_install("Cython>=0.29.0", description="Installing Cython")
+    results.append(run_pip_install("pip --upgrade", description="Upgrading pip"))
+    results.append(run_pip_install("setuptools wheel --upgrade", description="Installing build tools"))
+    results.append(run_pip_install("Cython>=0.29.0", description="Installing Cython"))
     
     print_step(2, "Installing core scientific packages")
-    run_pip_install("numpy>=1.24.0 scipy>=1.10.0", 
-                   description="Installing NumPy and SciPy")
-    run_pip_install("pandas>=2.0.0", description="Installing pandas")
+    results.append(run_pip_install("numpy>=1.24.0 scipy>=1.10.0", 
+                                  description="Installing NumPy and SciPy"))
+    results.append(run_pip_install("pandas>=2.0.0", description="Installing pandas"))
     
     print_step(3, "Installing audio processing dependencies")
-    run_pip_install("llvmlite>=0.39.0", description="Installing llvmlite")
-    run_pip_install("numba>=0.56.4", description="Installing numba")
-    run_pip_install("pooch>=1.6.0", description="Installing pooch")
-    run_pip_install("audioread>=3.0.0 soundfile>=0.12.0", 
-                   description="Installing audio file libraries")
-    run_pip_install("librosa>=0.10.0", description="Installing librosa")
+    results.append(run_pip_install("llvmlite>=0.39.0", description="Installing llvmlite"))
+    results.append(run_pip_install("numba>=0.56.4", description="Installing numba"))
+    results.append(run_pip_install("pooch>=1.6.0", description="Installing pooch"))
+    results.append(run_pip_install("audioread>=3.0.0 soundfile>=0.12.0", 
+                                  description="Installing audio file libraries"))
+    results.append(run_pip_install("librosa>=0.10.0", description="Installing librosa"))
     
     print_step(4, "Installing MLflow and visualization libraries")
-    run_pip_install("matplotlib>=3.7.0 seaborn>=0.12.0", 
-                   description="Installing visualization libraries")
-    run_pip_install("mlflow==2.15.0", description="Installing MLflow (HP AI Studio compatible version)")
+    results.append(run_pip_install("matplotlib>=3.7.0 seaborn>=0.12.0", 
+                                  description="Installing visualization libraries"))
+    results.append(run_pip_install("mlflow==2.15.0", description="Installing MLflow (HP AI Studio compatible version)"))
     
     print_step(5, "Installing remaining dependencies from requirements.txt")
-    req_file = repo_root / "requirements.txt"
-    run_pip_install(["-r", str(req_file)], 
-                   description=f"Installing from {req_file}", timeout=600)
+    results.append(run_pip_install(["-r", str(req_file)], 
+                                  description=f"Installing from {req_file}", timeout=600))
+    
+    if all(results):
+        try:
+            INSTALL_STAMP.write_text(install_hash)
+        except OSError as e:
+            print(f"⚠️ Could not record install stamp: {e}")
     
     print("\n✨ Installation complete! ✨")
     print("\nYou should now be able to run the Orpheus demo notebooks successfully.")
@@ -39,6 +39,17 @@ except ImportError:
     AUDIO_LIBS_AVAILABLE = False
     print("⚠️ Audio libraries not available for advanced TensorBoard logging")
 
+# Scalar metrics logged by log_audio_analysis, paired with their precomputed tags
+AUDIO_SCALAR_TAGS = tuple(
+    (metric, f'Audio/{metric.replace("_", " ").title()}')
+    for metric in (
+        'quality_score', 'lufs', 'peak_db', 'rms_db', 'tempo_bpm',
+        'spectral_centroid', 'spectral_bandwidth', 'spectral_rolloff',
+        'zero_crossing_rate', 'harmonic_ratio', 'percussive_ratio',
+        'crest_factor', 'duration'
+    )
+)
+
 
 def check_tensorboard_compatibility() -> bool:
     """
@@ -341,45 +352,42 @@ class OrpheusTensorBoardManager:
         if step is None:
             step = self.get_next_step(writer_name)
         
-        # Log scalar metrics
-        scalar_metrics = [
-            'quality_score', 'lufs', 'peak_db', 'rms_db', 'tempo_bpm',
-            'spectral_centroid', 'spectral_bandwidth', 'spectral_rolloff',
-            'zero_crossing_rate', 'harmonic_ratio', 'percussive_ratio',
-            'crest_factor', 'duration'
-        ]
+        results = analysis_results or {}
+        get = results.get
         
-        for metric in scalar_metrics:
-            if metric in analysis_results and analysis_results[metric] is not None:
-                try:
-                    value = float(analysis_results[metric])
-                    writer.add_scalar(f'Audio/{metric.replace("_", " ").title()}', value, step)
-                except (ValueError, TypeError):
-                    continue
+        # Collect scalar metrics in one pass, then emit them together
+        scalars = {}
+        for metric, tag in AUDIO_SCALAR_TAGS:
+            value = get(metric)
+            if value is None:
+                continue
+            try:
+                scalars[tag] = float(value)
+            except (ValueError, TypeError):
+                continue
         
         # Log compliance as histogram
-        if 'compliance' in analysis_results:
-            compliance_data = analysis_results['compliance']
-            if isinstance(compliance_data, dict):
-                compliance_score = sum(compliance_data.values()) / len(compliance_data)
-                writer.add_scalar('Audio/Compliance_Score', compliance_score, step)
-                
-                # Log individual compliance metrics
-                for key, value in compliance_data.items():
-                    writer.add_scalar(f'Compliance/{key.replace("_", " ").title()}', 
-                                    int(value), step)
+        compliance_data = get('compliance')
+        if isinstance(compliance_data, dict) and compliance_data:
+            scalars['Audio/Compliance_Score'] = sum(compliance_data.values()) / len(compliance_data)
+            
+            # Log individual compliance metrics
+            for key, value in compliance_data.items():
+                scalars[f'Compliance/{key.replace("_", " ").title()}'] = int(value)
+        
+        for tag, value in scalars.items():
+            writer.add_scalar(tag, value, step)
         
         # Log MFCC features as histogram
-        if 'mfcc_mean' in analysis_results:
-            mfcc_data = analysis_results['mfcc_mean']
-            if isinstance(mfcc_data, list) and len(mfcc_data) > 0:
-                writer.add_histogram('Audio/MFCC_Coefficients', 
-                                   np.array(mfcc_data), step)
+        mfcc_data = get('mfcc_mean')
+        if isinstance(mfcc_data, list) and mfcc_data:
+            writer.add_histogram('Audio/MFCC_Coefficients', 
+                               np.array(mfcc_data), step)
         
         # Log genre as text
-        if 'predicted_genre' in analysis_results:
-            writer.add_text('Audio/Predicted_Genre', 
-                          str(analysis_results['predicted_genre']), step)
+        predicted_genre = get('predicted_genre')
+        if predicted_genre is not None:
+            writer.add_text('Audio/Predicted_Genre', str(predicted_genre), step)
         
         writer.flush()
     
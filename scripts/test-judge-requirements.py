@@ -69,12 +69,14 @@ def main():
             duration = 1.0
             frequency = 440.0  # A4 note
             
-            t = np.linspace(0, duration, int(sample_rate * duration))
-            test_signal = 0.5 * np.sin(2 * np.pi * frequency * t)
+            phase = np.arange(int(sample_rate * duration), dtype=np.float32) * np.float32(2 * np.pi * frequency / sample_rate)
+            test_signal = 0.5 * np.sin(phase)
             
-            # Test basic librosa functionality
-            mfcc = librosa.feature.mfcc(y=test_signal, sr=sample_rate, n_mfcc=13)
-            spectral_centroids = librosa.feature.spectral_centroid(y=test_signal, sr=sample_rate)
+            # Test basic librosa functionality (both features share one STFT)
+            magnitude = np.abs(librosa.stft(test_signal))
+            mel = librosa.feature.melspectrogram(S=magnitude ** 2, sr=sample_rate)
+            mfcc = librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=13)
+            spectral_centroids = librosa.feature.spectral_centroid(S=magnitude, sr=sample_rate)
             
             print(f"🔊 Test Audio Analysis:")
             print(f"   - Signal length: {len(test_signal)} samples")
@@ -3,8 +3,27 @@ Orpheus Engine RAG Pipeline Module
 Implements audio analysis and retrieval-augmented generation functionality.
 """
 
-from .rag_pipeline import RagPipeline
-from .audio_utils import AudioProcessor
-from .chroma_utils import ChromaManager
+import importlib
 
+# Public classes are imported on first access (PEP 562) so that importing the
+# package does not pull in librosa or chromadb until they are actually needed
+_LAZY_IMPORTS = {
+    'RagPipeline': '.rag_pipeline',
+    'AudioProcessor': '.audio_utils',
+    'ChromaManager': '.chroma_utils',
+}
+
+__all__ = list(_LAZY_IMPORTS)
 __version__ = '1.0.9'
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -2,23 +2,172 @@
 Audio processing utilities for the RAG pipeline
 """
 
+import asyncio
+import functools
+import hashlib
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 import librosa
 import numpy as np
-from typing import Dict, List
+import scipy.signal
+from typing import Dict, List, Optional
 import soundfile as sf
 
+# Bump when the feature pipeline changes so stale cache entries are ignored
+FEATURE_CACHE_VERSION = 1
+DEFAULT_FEATURE_CACHE_DIR = Path('~/.cache/orpheus/features').expanduser()
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+@functools.lru_cache(maxsize=32)
+def mel_basis(sr: int, n_fft: int = 2048, n_mels: int = 128) -> np.ndarray:
+    """Return a cached, read-only mel filterbank instead of rebuilding it per file"""
+    basis = librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels)
+    basis.flags.writeable = False
+    return basis
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(parallel=True, cache=True)
+    def _row_means_into(matrix, out, offset):
+        """Write the mean of each row of matrix into out[offset:]"""
+        cols = matrix.shape[1]
+        for i in numba.prange(matrix.shape[0]):
+            total = 0.0
+            for j in range(cols):
+                total += matrix[i, j]
+            out[offset + i] = total / cols
+
+
+def _concat_row_means(*matrices) -> np.ndarray:
+    """Concatenate the per-row means of several feature matrices"""
+    if not NUMBA_AVAILABLE:
+        return np.concatenate([np.mean(m, axis=1) for m in matrices])
+    
+    out = np.empty(sum(m.shape[0] for m in matrices), dtype=np.float64)
+    offset = 0
+    for m in matrices:
+        _row_means_into(np.ascontiguousarray(m), out, offset)
+        offset += m.shape[0]
+    return out
+
+
+def sample_windows(y: np.ndarray, fraction: float, window: int) -> np.ndarray:
+    """
+    Keep evenly spaced windows of y that together cover about `fraction` of it.
+    
+    Summary statistics such as MFCC or chroma means stay representative on a
+    fraction of a music clip, so feature extraction can skip the rest.
+    """
+    if fraction >= 1.0 or len(y) <= window:
+        return y
+    
+    n_windows = max(1, int(round(fraction * len(y) / window)))
+    starts = np.linspace(0, len(y) - window, n_windows).astype(int)
+    return np.concatenate([y[start:start + window] for start in starts])
+
+
 class AudioProcessor:
-    def __init__(self):
+    def __init__(self, analyze_fraction: float = 1.0, window_seconds: float = 1.0,
+                 cache_dir: Optional[str] = None, use_cache: bool = True):
+        """
+        Args:
+            analyze_fraction: Fraction of each file used for feature extraction
+                (1.0 analyzes the whole file; 0.1-0.25 is usually enough for
+                embedding statistics)
+            window_seconds: Length of each sampled window when analyze_fraction < 1
+            cache_dir: Directory for cached feature arrays
+                (default ~/.cache/orpheus/features)
+            use_cache: Reuse features of files that have not changed since
+                they were last extracted
+        """
         self.sample_rate = 44100
+        self.analyze_fraction = analyze_fraction
+        self.window_seconds = window_seconds
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_FEATURE_CACHE_DIR
+        self.use_cache = use_cache
+        # Feature extraction is CPU-bound; FFTs release the GIL, so one
+        # worker per core lets batch ingestion use every core
+        self._executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+        
+    def load_audio(self, audio_path: str):
+        """
+        Load audio as float32 mono at self.sample_rate.
+        
+        Reads with soundfile and resamples with a polyphase filter only when
+        the file's rate differs; formats libsndfile cannot decode fall back
+        to librosa.load.
+        """
+        try:
+            y, sr = sf.read(audio_path, dtype='float32', always_2d=False)
+        except RuntimeError:
+            return librosa.load(audio_path, sr=self.sample_rate)
+        
+        if y.ndim > 1:
+            y = y.mean(axis=1, dtype=np.float32)
+        if sr != self.sample_rate:
+            g = math.gcd(sr, self.sample_rate)
+            y = scipy.signal.resample_poly(y, self.sample_rate // g, sr // g).astype(np.float32)
+        return y, self.sample_rate
         
     async def extract_features(self, audio_path: str) -> Dict:
-        """Extract audio features using librosa"""
-        y, sr = librosa.load(audio_path, sr=self.sample_rate)
+        """Extract audio features using librosa, off the event loop thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._extract_features_sync, audio_path)
+    
+    def _feature_cache_path(self, audio_path: str) -> Path:
+        """Cache file for audio_path, keyed on its identity and the extraction settings"""
+        stat = os.stat(audio_path)
+        key = (f"{os.path.abspath(audio_path)}|{stat.st_mtime_ns}|{stat.st_size}|"
+               f"{self.sample_rate}|{self.analyze_fraction}|{self.window_seconds}|"
+               f"{FEATURE_CACHE_VERSION}")
+        return self.cache_dir / f"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}.npz"
+    
+    def _extract_features_sync(self, audio_path: str) -> Dict:
+        if not self.use_cache:
+            return self._compute_features(audio_path)
+        
+        cache_path = self._feature_cache_path(audio_path)
+        if cache_path.exists():
+            try:
+                with np.load(cache_path) as cached:
+                    return {name: cached[name] for name in cached.files}
+            except (OSError, ValueError):
+                pass  # Unreadable entry; recompute and overwrite it
+        
+        features = self._compute_features(audio_path)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write to a per-thread temp file, then rename, so concurrent
+            # workers never read a half-written entry
+            tmp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.npz")
+            np.savez(tmp_path, **features)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass  # Caching is best effort
+        return features
+    
+    def _compute_features(self, audio_path: str) -> Dict:
+        y, sr = self.load_audio(audio_path)
+        y = sample_windows(y, self.analyze_fraction, int(self.window_seconds * sr))
+        
+        # One STFT feeds every feature instead of each recomputing its own
+        magnitude = np.abs(librosa.stft(y))
+        power = magnitude ** 2
         
         # Extract features
-        mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-        spectral = librosa.feature.spectral_contrast(y=y, sr=sr)
-        chroma = librosa.feature.chroma_stft(y=y, sr=sr)
+        mel_db = librosa.power_to_db(mel_basis(sr) @ power)
+        mfcc = librosa.feature.mfcc(S=mel_db, sr=sr, n_mfcc=13)
+        spectral = librosa.feature.spectral_contrast(S=magnitude, sr=sr)
+        chroma = librosa.feature.chroma_stft(S=power, sr=sr)
         
         return {
             'mfcc': mfcc,
@@ -27,21 +176,30 @@ class AudioProcessor:
         }
     
     async def analyze(self, audio_path: str) -> Dict:
-        """Perform detailed audio analysis"""
-        y, sr = librosa.load(audio_path, sr=self.sample_rate)
+        """Perform detailed audio analysis, off the event loop thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._analyze_sync, audio_path)
+    
+    def _analyze_sync(self, audio_path: str) -> Dict:
+        y, sr = self.load_audio(audio_path)
+        
+        # Tempo, beats and the onset envelope all start from the same log-mel
+        # spectrogram; compute it once. beat_track aggregates onsets with the
+        # median rather than the mean, so it gets its own envelope from it.
+        mel_db = librosa.power_to_db(mel_basis(sr) @ (np.abs(librosa.stft(y)) ** 2))
+        onset_env = librosa.onset.onset_strength(S=mel_db, sr=sr)
+        _, beats = librosa.beat.beat_track(
+            onset_envelope=librosa.onset.onset_strength(S=mel_db, sr=sr, aggregate=np.median), sr=sr
+        )
         
         return {
-            'duration': librosa.get_duration(y=y, sr=sr),
-            'tempo': librosa.beat.tempo(y=y, sr=sr)[0],
-            'beats': librosa.beat.beat_track(y=y, sr=sr)[1].tolist(),
-            'onset_env': librosa.onset.onset_strength(y=y, sr=sr).tolist()
+            'duration': len(y) / sr,
+            'tempo': librosa.feature.tempo(onset_envelope=onset_env, sr=sr)[0],
+            'beats': beats.tolist(),
+            'onset_env': onset_env.tolist()
         }
         
     def compute_embedding(self, features: Dict) -> np.ndarray:
         """Compute embedding from audio features"""
-        # Combine features into a single embedding
-        mfcc_mean = np.mean(features['mfcc'], axis=1)
-        spectral_mean = np.mean(features['spectral'], axis=1)
-        chroma_mean = np.mean(features['chroma'], axis=1)
-        
-        return np.concatenate([mfcc_mean, spectral_mean, chroma_mean])
+        # Combine per-row feature means into a single embedding in one pass
+        return _concat_row_means(features['mfcc'], features['spectral'], features['chroma'])
@@ -2,6 +2,8 @@
 ChromaDB integration utilities for the RAG pipeline
 """
 
+import asyncio
+import hashlib
 import chromadb
 from chromadb.config import Settings
 from typing import Dict, List
@@ -15,20 +17,41 @@ class ChromaManager:
             metadata={"hnsw:space": "cosine"}
         )
         
+    @staticmethod
+    def embedding_id(audio_path: str) -> str:
+        """Stable ID for an audio path (built-in hash() is salted per process)"""
+        return hashlib.blake2b(audio_path.encode(), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _normalize(embeddings: np.ndarray) -> np.ndarray:
+        # Chroma keeps float32 vectors and the collection uses cosine space, so
+        # hand it unit-length float32 vectors instead of raw float64 values
+        vectors = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        return vectors / (np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12)
+        
     def store_embedding(self, audio_path: str, embedding: np.ndarray) -> Dict:
         """Store audio embedding in ChromaDB"""
-        self.collection.add(
-            documents=[audio_path],
-            embeddings=[embedding.tolist()],
-            ids=[str(hash(audio_path))]
+        return self.store_embeddings_batch([audio_path], embedding)[0]
+    
+    def store_embeddings_batch(self, audio_paths: List[str], embeddings: np.ndarray) -> List[Dict]:
+        """Store N audio embeddings (N x D) in ChromaDB with a single call"""
+        self.collection.upsert(
+            documents=list(audio_paths),
+            embeddings=self._normalize(embeddings).tolist(),
+            ids=[self.embedding_id(path) for path in audio_paths]
         )
-        return {"status": "success", "path": audio_path}
+        return [{"status": "success", "path": path} for path in audio_paths]
         
     async def search(self, query_text: str, top_k: int = 5) -> List[Dict]:
         """Search for similar audio files"""
-        results = self.collection.query(
+        # Chroma queries hit SQLite and the embedding model synchronously;
+        # run them off the event loop thread
+        results = await asyncio.to_thread(
+            self.collection.query,
             query_texts=[query_text],
-            n_results=top_k
+            n_results=top_k,
+            # Only fetch the columns we return; metadatas are never used
+            include=["documents", "distances"]
         )
         
         return [
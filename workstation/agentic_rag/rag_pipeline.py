@@ -3,9 +3,9 @@ Core RAG Pipeline implementation for audio processing and analysis
 """
 
 import os
+import asyncio
 import numpy as np
 from typing import Dict, List, Optional
-import chromadb
 from .audio_utils import AudioProcessor
 from .chroma_utils import ChromaManager
 
@@ -19,6 +19,16 @@ class RagPipeline:
         features = await self.audio_processor.extract_features(audio_path)
         embedding = self.audio_processor.compute_embedding(features)
         return self.chroma_manager.store_embedding(audio_path, embedding)
+    
+    async def process_audio_batch(self, audio_paths: List[str]) -> List[Dict]:
+        """Process several audio files concurrently and store their embeddings"""
+        if not audio_paths:
+            return []
+        features = await asyncio.gather(
+            *(self.audio_processor.extract_features(path) for path in audio_paths)
+        )
+        embeddings = np.stack([self.audio_processor.compute_embedding(f) for f in features])
+        return self.chroma_manager.store_embeddings_batch(audio_paths, embeddings)
         
     async def query(self, query_text: str, top_k: int = 5) -> List[Dict]:
         """Query the RAG pipeline with text"""
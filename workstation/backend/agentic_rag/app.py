@@ -1,11 +1,26 @@
-from flask import Flask, request, jsonify, render_template, redirect, url_for
+from flask import Flask, request, jsonify, render_template, redirect, url_for, send_from_directory
+from werkzeug.utils import secure_filename
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import logging
 import os
+import shutil
+import tempfile
+
+logger = logging.getLogger(__name__)
 
 # Placeholder for actual transcription and RAG logic
 # from your_transcription_module import transcribe_audio
 # from your_rag_module import process_with_rag
 
 app = Flask(__name__)
+# Reject uploads larger than this before reading them (bytes, default 1 GiB)
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_BYTES', 1 << 30))
+# Let a fronting nginx/Apache send segment files instead of the Python worker
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', 'false').lower() == 'true'
+# Directory save_audio_segments exports clips into
+SEGMENTS_DIR = os.path.abspath(os.environ.get('SEGMENTS_DIR', 'audio_clips'))
+UPLOAD_CHUNK_SIZE = 1 << 20
 
 # Ensure the templates folder is correctly set up if not in the default location
 # By default, Flask looks for a 'templates' folder in the same directory as the app.py file.
@@ -23,16 +38,61 @@ def perform_transcription(audio_file_path):
     # return transcribe_audio(audio_file_path)
     return f"This is a dummy transcription for {os.path.basename(audio_file_path)}."
 
+EDITED_TRANSCRIPTION_PATH = "edited_transcription.txt"
+
+# Disk writes run here so the request thread can respond without waiting on
+# them. A single worker applies saves in the order they were submitted, so the
+# last edit always wins.
+EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
+def _write_transcription(text_content, path=EDITED_TRANSCRIPTION_PATH):
+    # Write to a temp file, fsync, then rename so readers never see a torn file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text_content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    logger.debug("Edited transcription saved to %s", path)
+
+def save_upload(file_storage, directory):
+    """
+    Copy an uploaded file to disk in fixed-size chunks.
+
+    Memory stays constant regardless of the upload size, and the SHA-256 of
+    the content is computed during the same pass.
+
+    Returns:
+        (path, sha256 hex digest)
+    """
+    path = os.path.join(directory, secure_filename(file_storage.filename) or 'upload')
+    digest = hashlib.sha256()
+    with open(path, 'wb') as dst:
+        for chunk in iter(lambda: file_storage.stream.read(UPLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            dst.write(chunk)
+    return path, digest.hexdigest()
+
+def _log_save_failure(future):
+    exc = future.exception()
+    if exc is not None:
+        logger.error("Failed to save edited transcription: %s", exc, exc_info=exc)
+
 def save_edited_transcription(text_content):
     """
-    Placeholder for saving the edited transcription.
+    Queue the edited transcription to be saved in the background.
+
+    Returns True once the save is accepted, False if it could not be queued.
+    Errors from the write itself are logged when it finishes.
     """
-    # Example: save to a file or database
-    print(f"Edited transcription saved: {text_content}")
-    # For demonstration, we'll just print it.
-    # In a real app, you'd save this to a file or database.
-    with open("edited_transcription.txt", "w") as f:
-        f.write(text_content)
+    # In a real app, you'd save this to a database instead
+    try:
+        future = EXECUTOR.submit(_write_transcription, text_content)
+    except RuntimeError:
+        # The executor has been shut down (interpreter exiting)
+        logger.exception("Could not queue edited transcription save")
+        return False
+    future.add_done_callback(_log_save_failure)
     return True
 
 
@@ -60,19 +120,17 @@ def transcribe_route():
         return jsonify({"error": "No selected file"}), 400
 
     if audio_file:
-        # In a real app, you'd save the file securely and then process it
-        # For example:
-        # filename = secure_filename(audio_file.filename)
-        # audio_file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        # audio_file.save(audio_file_path)
-        
-        # Placeholder: using a dummy path for the example
-        dummy_audio_file_path = audio_file.filename 
-        transcribed_text = perform_transcription(dummy_audio_file_path)
-        
+        # Stream the upload to a temporary file rather than holding it in memory
+        upload_dir = tempfile.mkdtemp(prefix='orpheus-upload-')
+        try:
+            audio_file_path, content_hash = save_upload(audio_file, upload_dir)
+            transcribed_text = perform_transcription(audio_file_path)
+        finally:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+
         # Optionally, redirect to the edit page or return JSON
         # return redirect(url_for('edit_transcription_route', text=transcribed_text))
-        return jsonify({"transcription": transcribed_text})
+        return jsonify({"transcription": transcribed_text, "sha256": content_hash})
 
     return jsonify({"error": "File processing failed"}), 500
 
@@ -95,13 +153,23 @@ def save_transcription():
         return jsonify({"error": "No text provided to save"}), 400
 
     if save_edited_transcription(edited_text):
-        # Redirect to a success page or back to home, or show a success message
-        # For simplicity, redirecting to home with a message (not implemented here)
-        # Or, could redirect back to the edit page with a success flash message
-        return redirect(url_for('edit_transcription_route', text=edited_text + "\n\n(Changes saved!)"))
+        # The write finishes in the background, so report the save as
+        # accepted (202) rather than done
+        return render_template('edit_transcription.html',
+                               text_to_edit=edited_text + "\n\n(Save accepted, writing in the background.)"), 202
     else:
         return jsonify({"error": "Failed to save transcription"}), 500
 
+@app.route('/segments/<path:filename>')
+def download_segment(filename):
+    """
+    Serve an exported audio segment.
+
+    send_from_directory rejects paths outside SEGMENTS_DIR and streams the
+    file (or hands it to the web server when USE_X_SENDFILE is set).
+    """
+    return send_from_directory(SEGMENTS_DIR, filename, conditional=True)
+
 # Example route to demonstrate the edit window directly
 @app.route('/show_sample_edit')
 def show_sample_edit_page():
@@ -1,25 +1,98 @@
-import re
+import logging
 import os
-import torchaudio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import soundfile as sf
+
+logger = logging.getLogger(__name__)
+
+# Threads encoding segment files; libsndfile releases the GIL while writing
+SEGMENT_WRITE_WORKERS = int(os.environ.get("SEGMENT_WRITE_WORKERS", min(8, os.cpu_count() or 1)))
+
+# Characters that are not allowed in file names on Windows (and "/" anywhere)
+_FORBIDDEN_FILENAME_CHARS = str.maketrans({c: "_" for c in '\\/*?:"<>|'})
 
 def sanitize_filename(name):
-    return re.sub(r'[\\\\/*?:\"<>|]', "_", name).strip()
+    return name.translate(_FORBIDDEN_FILENAME_CHARS).strip()
+
+def _segment_paths(output_dir, segments):
+    # Whole-second bounds for the file names, truncated like int()
+    starts = np.array([seg['start'] for seg in segments], dtype=np.float64).astype(np.int64).tolist()
+    ends = np.array([seg['end'] for seg in segments], dtype=np.float64).astype(np.int64).tolist()
+    return [
+        os.path.join(output_dir, f"segment_{seg['id']}_{start}-{end}.wav")
+        for seg, start, end in zip(segments, starts, ends)
+    ]
+
+def _segment_bounds(segments, sr, frames=None):
+    """Start and end sample of every segment, computed in one vectorized pass."""
+    times = np.array([(seg['start'], seg['end']) for seg in segments], dtype=np.float64).reshape(-1, 2)
+    bounds = (times * sr).astype(np.int64)
+    if frames is not None:
+        np.minimum(bounds, frames, out=bounds)
+    return bounds[:, 0].tolist(), bounds[:, 1].tolist()
+
+def _write_segment(out_path, clip, sr):
+    sf.write(out_path, clip, sr, subtype='FLOAT')
+    logger.debug("Saved: %s", out_path)
+
+def _write_clips(clips, sr):
+    """
+    Write (out_path, clip) pairs on a thread pool.
+
+    At most two clips per worker are held in memory while waiting to be
+    written, so the reader never runs far ahead of the disk.
+    """
+    with ThreadPoolExecutor(max_workers=SEGMENT_WRITE_WORKERS) as executor:
+        pending = deque()
+        for out_path, clip in clips:
+            if len(pending) >= 2 * SEGMENT_WRITE_WORKERS:
+                pending.popleft().result()
+            pending.append(executor.submit(_write_segment, out_path, clip, sr))
+        for future in pending:
+            future.result()
 
 def save_audio_segments(audio_path, segments, query, output_base="audio_clips"):
     """
     Save relevant audio segments as separate files.
+
+    Only the requested ranges are decoded: each segment is a seek plus a read
+    of its own frames, so memory stays proportional to the longest segment
+    rather than the whole recording. Encoding and writing the files runs on
+    a thread pool while the next segments are read.
     """
     folder_name = sanitize_filename(query)
     output_dir = os.path.join(output_base, folder_name)
     os.makedirs(output_dir, exist_ok=True)
+    try:
+        f = sf.SoundFile(audio_path)
+    except RuntimeError:
+        # Container libsndfile cannot decode; fall back to a full torchaudio load
+        _save_audio_segments_torchaudio(audio_path, segments, output_dir)
+        return
+    with f:
+        sr = f.samplerate
+
+        starts, ends = _segment_bounds(segments, sr, f.frames)
+        paths = _segment_paths(output_dir, segments)
+
+        def read_clips():
+            for out_path, start_sample, end_sample in zip(paths, starts, ends):
+                f.seek(start_sample)
+                clip = f.read(max(end_sample - start_sample, 0), dtype='float32', always_2d=True)
+                yield out_path, clip
+
+        _write_clips(read_clips(), sr)
+
+def _save_audio_segments_torchaudio(audio_path, segments, output_dir):
+    import torchaudio
     waveform, sr = torchaudio.load(audio_path)
-    for seg in segments:
-        start_sample = int(seg['start'] * sr)
-        end_sample = int(seg['end'] * sr)
-        clip_waveform = waveform[:, start_sample:end_sample]
-        out_path = os.path.join(output_dir, f"segment_{seg['id']}_{int(seg['start'])}-{int(seg['end'])}.wav")
-        torchaudio.save(out_path, clip_waveform, sr)
-        print(f"Saved: {out_path}")
+    # soundfile expects (frames, channels)
+    samples = waveform.numpy().T
+    starts, ends = _segment_bounds(segments, sr)
+    paths = _segment_paths(output_dir, segments)
+    _write_clips(((path, samples[start:end]) for path, start, end in zip(paths, starts, ends)), sr)
 
 def get_segments(query: str):
     """Get audio segments for a given query"""
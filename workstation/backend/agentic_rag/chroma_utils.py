@@ -1,3 +1,9 @@
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
 def save_embeddings_to_chroma(embeddings, metadata, collection):
     """
     Save embeddings and their associated metadata to the ChromaDB collection.
@@ -7,13 +13,15 @@ def save_embeddings_to_chroma(embeddings, metadata, collection):
         metadata (list): List of metadata corresponding to each embedding.
         collection: ChromaDB collection to store the embeddings in.
     """
-    for i, embedding in enumerate(embeddings):
-        collection.add(
-            ids=[str(i)],  # Chroma requires string IDs
-            embeddings=[embedding.tolist()],
-            metadatas=[metadata[i]]
-        )
-    print("Successfully saved embeddings to ChromaDB.")
+    if len(embeddings) == 0:
+        return
+    # A single bulk add: one transaction instead of one per embedding
+    collection.add(
+        ids=[str(i) for i in range(len(embeddings))],  # Chroma requires string IDs
+        embeddings=np.asarray(embeddings, dtype=np.float32).tolist(),
+        metadatas=list(metadata[:len(embeddings)])
+    )
+    logger.info("Saved %d embeddings to ChromaDB.", len(embeddings))
 
 def retrieve_embeddings_from_chroma(query_embedding, collection, top_k=5):
     """
@@ -44,7 +52,5 @@ def initialize_chroma_collection(chroma_db_path, collection_name):
     Returns:
         ChromaDB collection object.
     """
-    import chromadb
-    chroma_client = chromadb.PersistentClient(path=chroma_db_path)
-    collection = chroma_client.get_or_create_collection(name=collection_name)
-    return collection
\ No newline at end of file
+    from .vector_store import open_collection
+    return open_collection(chroma_db_path, collection_name)
\ No newline at end of file
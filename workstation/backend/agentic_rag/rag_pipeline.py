@@ -1,8 +1,12 @@
-from typing import List, Dict, Any
-import torchaudio
-import whisper
+from typing import List, Dict, Any, Optional
+import hashlib
+import json
+import logging
 import os
-import re
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
 
 # Fix SQLite version issue for ChromaDB
 import sys
@@ -12,7 +16,57 @@ try:
 except ImportError:
     pass
 
-import chromadb
+from .audio_utils import sanitize_filename, save_audio_segments
+from .vector_store import open_collection
+
+# "cpp" transcribes with whisper.cpp through pywhispercpp (quantized ggml
+# weights, SIMD kernels) for CPU-only and Metal deployments
+WHISPER_BACKEND = os.environ.get("WHISPER_BACKEND", "auto").lower()
+
+# Prefer faster-whisper (CTranslate2, int8 kernels); fall back to openai-whisper
+try:
+    from faster_whisper import WhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+    if WHISPER_BACKEND != "cpp":
+        import whisper
+
+# faster-whisper >= 1.1 can decode many VAD chunks of one file per forward pass
+try:
+    from faster_whisper import BatchedInferencePipeline
+except ImportError:
+    BatchedInferencePipeline = None
+
+# Optional Aho-Corasick automaton for matching many queries in one pass
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Whisper checkpoint to load; the model is loaded once per process and reused
+WHISPER_MODEL_NAME = os.environ.get("WHISPER_MODEL", "base")
+# Chunks decoded together by the batched pipeline
+WHISPER_BATCH_SIZE = int(os.environ.get("WHISPER_BATCH_SIZE", 16))
+# Concurrent transcriptions the shared faster-whisper model can run
+WHISPER_NUM_WORKERS = int(os.environ.get("WHISPER_NUM_WORKERS", 4))
+# whisper.cpp model name or ggml file path, e.g. "base.en-q5_0"
+WHISPER_CPP_MODEL = os.environ.get("WHISPER_CPP_MODEL", WHISPER_MODEL_NAME)
+_whisper_model = None
+_batched_pipeline = None
+_whisper_cpp_model = None
+_whisper_cpp_lock = threading.Lock()
+
+# Transcripts are cached on disk keyed by the audio's content hash
+TRANSCRIPT_CACHE_DIR = os.environ.get("TRANSCRIPT_CACHE_DIR",
+                                      os.path.join(os.path.expanduser("~"), ".cache", "orpheus", "transcripts"))
+_whisper_lock = threading.Lock()
+
+# Sentence-transformers model for document and query embeddings (384-d, normalized)
+EMBEDDING_MODEL_NAME = os.environ.get("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", 64))
+_embedding_model = None
+_embedding_lock = threading.Lock()
 
 class AudioDocument:
     def __init__(self, text: str):
@@ -22,52 +76,225 @@ class AudioDocument:
     def getPageText(self) -> str:
         return self.page_content
 
-def sanitize_filename(name: str) -> str:
-    return re.sub(r'[\\\\/*?:\"<>|]', "_", name).strip()
-
-def save_audio_segments(audio_path: str, segments: List[Dict[str, Any]], query: str, output_base: str = "audio_clips") -> None:
-    folder_name = sanitize_filename(query)
-    output_dir = os.path.join(output_base, folder_name)
-    os.makedirs(output_dir, exist_ok=True)
-    waveform, sr = torchaudio.load(audio_path)
-    for seg in segments:
-        start_sample = int(seg['start'] * sr)
-        end_sample = int(seg['end'] * sr)
-        clip_waveform = waveform[:, start_sample:end_sample]
-        out_path = os.path.join(output_dir, f"segment_{seg['id']}_{int(seg['start'])}-{int(seg['end'])}.wav")
-        torchaudio.save(out_path, clip_waveform, sr)
-        print(f"Saved: {out_path}")
-
 def find_relevant_audio_segments(query: str, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    query_lower = query.lower()
-    relevant_segments = [segment for segment in segments if query_lower in segment["text"].lower()]
-    print(f"Total relevant segments found: {len(relevant_segments)}")
+    relevant_segments = find_relevant_audio_segments_multi([query], segments)[query]
+    logger.debug("Total relevant segments found: %d", len(relevant_segments))
     return relevant_segments
 
+def find_relevant_audio_segments_multi(queries: List[str], segments: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Match several queries against the segments, returning {query: relevant segments}."""
+    results: Dict[str, List[Dict[str, Any]]] = {query: [] for query in queries}
+    # Lowercased once per call and kept private, so the caller's segments are not modified
+    lowered = [segment["text"].lower() for segment in segments]
+    words = {query.lower() for query in queries if query}
+    if ahocorasick is None or not words:
+        for query in queries:
+            query_lower = query.lower()
+            results[query] = [segment for segment, text in zip(segments, lowered) if query_lower in text]
+        return results
+
+    # One automaton pass per segment finds every query it contains
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    by_word: Dict[str, List[str]] = {}
+    for query in results:
+        by_word.setdefault(query.lower(), []).append(query)
+    for segment, text in zip(segments, lowered):
+        matched = {word for _, word in automaton.iter(text)}
+        matched.add("")  # The empty query matches every segment, as with "in"
+        for word in matched:
+            for query in by_word.get(word, ()):
+                results[query].append(segment)
+    return results
+
+def get_whisper_model():
+    """Return the process-wide Whisper model, loading it on first use."""
+    global _whisper_model
+    if _whisper_model is None:
+        with _whisper_lock:
+            if _whisper_model is None:
+                import torch
+                device = "cuda" if torch.cuda.is_available() else "cpu"
+                if FASTER_WHISPER_AVAILABLE:
+                    # int8 weights with fp16 activations need tensor cores (sm_70+)
+                    if device == "cuda":
+                        compute_type = "int8_float16" if torch.cuda.get_device_capability()[0] >= 7 else "float16"
+                    else:
+                        compute_type = "int8"
+                    _whisper_model = WhisperModel(WHISPER_MODEL_NAME, device=device, compute_type=compute_type,
+                                                  num_workers=WHISPER_NUM_WORKERS)
+                else:
+                    _whisper_model = whisper.load_model(WHISPER_MODEL_NAME, device=device)
+    return _whisper_model
+
+def get_batched_pipeline():
+    """Return the shared batched faster-whisper pipeline, or None if unsupported."""
+    global _batched_pipeline
+    if _batched_pipeline is None and FASTER_WHISPER_AVAILABLE and BatchedInferencePipeline is not None:
+        model = get_whisper_model()
+        with _whisper_lock:
+            if _batched_pipeline is None:
+                _batched_pipeline = BatchedInferencePipeline(model=model)
+    return _batched_pipeline
+
+def get_embedding_model():
+    """Return the process-wide sentence-transformers model, loading it on first use."""
+    global _embedding_model
+    if _embedding_model is None:
+        with _embedding_lock:
+            if _embedding_model is None:
+                import torch
+                from sentence_transformers import SentenceTransformer
+                device = "cuda" if torch.cuda.is_available() else "cpu"
+                model = SentenceTransformer(EMBEDDING_MODEL_NAME, device=device)
+                if device == "cuda":
+                    model.half()  # fp16 halves weight bandwidth; cosine ranking is unaffected
+                _embedding_model = model
+    return _embedding_model
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """Encode texts in batches into an (n, dim) float32 array of unit vectors."""
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    embeddings = get_embedding_model().encode(
+        texts,
+        batch_size=EMBEDDING_BATCH_SIZE,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False
+    )
+    return embeddings.astype(np.float32, copy=False)
+
+def get_whisper_cpp_model():
+    """Return the process-wide whisper.cpp model, loading it on first use."""
+    global _whisper_cpp_model
+    if _whisper_cpp_model is None:
+        with _whisper_cpp_lock:
+            if _whisper_cpp_model is None:
+                from pywhispercpp.model import Model
+                _whisper_cpp_model = Model(WHISPER_CPP_MODEL, n_threads=os.cpu_count() or 4)
+    return _whisper_cpp_model
+
+def whisper_backend() -> str:
+    """Name of the transcription backend in use."""
+    if WHISPER_BACKEND == "cpp":
+        return "whisper.cpp"
+    return "faster-whisper" if FASTER_WHISPER_AVAILABLE else "openai-whisper"
+
+def audio_content_hash(audio_path: str) -> str:
+    """SHA-256 of the file's bytes, so renamed or re-uploaded copies share a key."""
+    digest = hashlib.sha256()
+    with open(audio_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def transcribe_segments(audio_path: str) -> List[Dict[str, Any]]:
+    """Transcribe audio into timestamped segments ({id, start, end, text}), reusing cached transcripts."""
+    backend = whisper_backend()
+    model_name = WHISPER_CPP_MODEL if backend == "whisper.cpp" else WHISPER_MODEL_NAME
+    key = f"{audio_content_hash(audio_path)}-{backend}-{sanitize_filename(model_name)}"
+    cache_path = os.path.join(TRANSCRIPT_CACHE_DIR, f"{key}.json")
+    try:
+        with open(cache_path) as f:
+            return json.load(f)["segments"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    segments = _run_whisper(audio_path)
+    try:
+        os.makedirs(TRANSCRIPT_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"text": " ".join(seg["text"] for seg in segments), "segments": segments}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # Caching is best effort
+    return segments
+
+def _run_whisper(audio_path: str) -> List[Dict[str, Any]]:
+    if WHISPER_BACKEND == "cpp":
+        model = get_whisper_cpp_model()
+        # A whisper.cpp context is not safe to share between concurrent calls
+        with _whisper_cpp_lock:
+            segments = model.transcribe(audio_path)
+        # whisper.cpp timestamps are in 10 ms units
+        return [
+            {"id": str(i), "start": seg.t0 / 100.0, "end": seg.t1 / 100.0, "text": seg.text.strip()}
+            for i, seg in enumerate(segments)
+        ]
+    model = get_whisper_model()
+    if FASTER_WHISPER_AVAILABLE:
+        batched = get_batched_pipeline()
+        if batched is not None:
+            segments, _ = batched.transcribe(audio_path, beam_size=1, batch_size=WHISPER_BATCH_SIZE)
+        else:
+            segments, _ = model.transcribe(audio_path, beam_size=1, vad_filter=True)
+        return [
+            {"id": str(i), "start": seg.start, "end": seg.end, "text": seg.text.strip()}
+            for i, seg in enumerate(segments)
+        ]
+    # Passing the decoded samples as a tensor on the model's device makes
+    # whisper compute the log-mel spectrogram there instead of on the CPU
+    import torch
+    audio = torch.from_numpy(whisper.load_audio(audio_path)).to(model.device)
+    result = model.transcribe(audio)
+    return [
+        {"id": str(seg["id"]), "start": seg["start"], "end": seg["end"], "text": seg["text"].strip()}
+        for seg in result["segments"]
+    ]
+
 def load_and_transcribe_audio(audio_path: str) -> List[AudioDocument]:
-    model = whisper.load_model("base")
-    result = model.transcribe(audio_path)
-    text_content = result["text"]
-    documents = [AudioDocument(text_content)]
-    print(f"Successfully loaded {len(documents)} document(s) from the AUDIO.")
+    segments = transcribe_segments(audio_path)
+    text_content = " ".join(seg["text"] for seg in segments)
+    document = AudioDocument(text_content)
+    # Keep the timestamps so segments can be cut without transcribing again
+    document.metadata["segments"] = segments
+    documents = [document]
+    logger.debug("Loaded %d document(s) from the audio.", len(documents))
     return documents
 
-def initialize_chroma_db(chroma_db_path: str, collection_name: str) -> chromadb.PersistentClient:
-    chroma_client = chromadb.PersistentClient(path=chroma_db_path)
-    return chroma_client.get_or_create_collection(name=collection_name)
+def initialize_chroma_db(chroma_db_path: str, collection_name: str) -> Any:
+    # Chroma by default; VECTOR_BACKEND selects an in-process alternative.
+    # open_collection imports chromadb only when the Chroma backend is used.
+    return open_collection(chroma_db_path, collection_name)
+
+CHROMA_ADD_BATCH_SIZE = 1000
+
+def add_embeddings_to_chroma(collection: Any, document_embeddings: Optional[List[List[float]]], doc_texts: List[str]) -> None:
+    """Add documents to the collection; pass document_embeddings=None to embed doc_texts with embed_texts."""
+    if not doc_texts:
+        return
+    # IDs are content hashes, so texts already in the collection are skipped
+    # instead of being re-added under a new positional ID
+    ids = [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in doc_texts]
+    seen = set(collection.get(ids=ids, include=[])["ids"])
+    keep = []
+    for i, doc_id in enumerate(ids):
+        if doc_id not in seen:
+            seen.add(doc_id)
+            keep.append(i)
 
-def add_embeddings_to_chroma(collection: Any, document_embeddings: List[List[float]], doc_texts: List[str]) -> None:
-    for i, embedding in enumerate(document_embeddings):
+    # One bulk add per batch instead of one transaction per document
+    if document_embeddings is None:
+        # Only the texts that are not stored yet need encoding
+        embeddings = embed_texts([doc_texts[i] for i in keep])
+    else:
+        embeddings = np.asarray(document_embeddings, dtype=np.float32)[keep]
+    for start in range(0, len(keep), CHROMA_ADD_BATCH_SIZE):
+        batch = keep[start:start + CHROMA_ADD_BATCH_SIZE]
         collection.add(
-            ids=[str(i)],
-            embeddings=[embedding.tolist()],
-            metadatas=[{"text": doc_texts[i]}]
+            ids=[ids[i] for i in batch],
+            embeddings=embeddings[start:start + CHROMA_ADD_BATCH_SIZE].tolist(),
+            metadatas=[{"text": doc_texts[i]} for i in batch]
         )
-    print("Successfully populated Chroma database with document embeddings.")
+    logger.info("Added %d new document embeddings to the collection.", len(keep))
 
 def run_rag_pipeline():
     """Initialize and run the RAG pipeline"""
-    print("RAG pipeline initialized successfully")
+    logger.info("RAG pipeline initialized successfully")
     return {"status": "initialized"}
 
 def search_audio(query: str):
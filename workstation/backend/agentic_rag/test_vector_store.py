@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Vector Store Tests for the Agentic RAG Backend
+
+Checks SqliteVecCollection against an empty store and a store whose rows
+were written while the sqlite-vec extension could not be loaded. Tests that
+need sqlite-vec are skipped when the extension is unavailable.
+
+Usage:
+    python -m pytest test_vector_store.py
+    python test_vector_store.py
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add current directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
+
+from vector_store import SqliteVecCollection
+
+
+class SqliteVecCollectionTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_query_empty_store(self):
+        collection = SqliteVecCollection(self.path, "segments")
+        result = collection.query(query_embeddings=[[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], n_results=5)
+        self.assertEqual(result, {"ids": [[], []], "distances": [[], []], "metadatas": [[], []]})
+
+    def test_backfills_rows_added_without_extension(self):
+        # Block the import so the first connection falls back to plain SQLite
+        with mock.patch.dict(sys.modules, {"sqlite_vec": None}):
+            collection = SqliteVecCollection(self.path, "segments")
+            self.assertFalse(collection.vec_enabled)
+            collection.add(ids=["a", "b"], embeddings=[[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]],
+                           metadatas=[{"n": 1}, {"n": 2}])
+            collection.conn.close()
+
+        collection = SqliteVecCollection(self.path, "segments")
+        if not collection.vec_enabled:
+            self.skipTest("sqlite-vec extension is not available")
+        count = collection.conn.execute("SELECT COUNT(*) FROM vec_documents").fetchone()[0]
+        self.assertEqual(count, 2)
+
+        result = collection.query(query_embeddings=[[0.0, 1.0, 0.0]], n_results=2)
+        self.assertEqual(result["ids"], [["b", "a"]])
+        self.assertEqual(result["metadatas"][0][0], {"n": 2})
+        self.assertAlmostEqual(result["distances"][0][0], 0.0, places=5)
+
+        # Reopening does not index the same rows twice
+        collection.conn.close()
+        collection = SqliteVecCollection(self.path, "segments")
+        count = collection.conn.execute("SELECT COUNT(*) FROM vec_documents").fetchone()[0]
+        self.assertEqual(count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
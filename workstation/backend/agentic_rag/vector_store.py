@@ -0,0 +1,248 @@
+"""
+Alternative vector stores for the agentic RAG backend.
+
+Each store implements the subset of the ChromaDB collection API this package
+uses (add / get / query), so callers can switch backends with the
+VECTOR_BACKEND environment variable without changing how they use the
+collection:
+
+    chroma      - ChromaDB persistent collection (default)
+    faiss       - in-process FAISS index over L2-normalized vectors
+    sqlite-vec  - SQLite database with a sqlite-vec vec0 table
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+VECTOR_BACKEND = os.environ.get("VECTOR_BACKEND", "chroma").lower()
+# FAISS index type: "flat" (exact inner product) or "hnsw" (approximate, for >100k vectors)
+FAISS_INDEX_TYPE = os.environ.get("FAISS_INDEX_TYPE", "flat").lower()
+
+
+def _normalized(vectors) -> np.ndarray:
+    vectors = np.array(vectors, dtype=np.float32, ndmin=2, copy=True)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+    return vectors
+
+
+class FaissCollection:
+    """
+    Chroma-compatible collection backed by a FAISS inner-product index.
+
+    Vectors are L2-normalized, so scores are cosine similarities; query()
+    reports distances as 1 - similarity like Chroma's cosine space. The index
+    and the id/metadata table are persisted next to each other under path.
+    """
+
+    def __init__(self, path: str, name: str):
+        import faiss
+        self._faiss = faiss
+        os.makedirs(path, exist_ok=True)
+        self._index_path = os.path.join(path, f"{name}.faiss")
+        self._meta_path = os.path.join(path, f"{name}.json")
+        self.index = None
+        self.ids: List[str] = []
+        self.metadatas: List[Optional[Dict[str, Any]]] = []
+        if os.path.exists(self._index_path) and os.path.exists(self._meta_path):
+            self.index = faiss.read_index(self._index_path)
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+            self.ids, self.metadatas = meta["ids"], meta["metadatas"]
+            if self.index.ntotal != len(self.ids):
+                raise ValueError(
+                    f"FAISS index {self._index_path} holds {self.index.ntotal} vectors "
+                    f"but {self._meta_path} lists {len(self.ids)} ids"
+                )
+        self._positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+
+    def _new_index(self, dim: int):
+        if FAISS_INDEX_TYPE == "hnsw":
+            return self._faiss.IndexHNSWFlat(dim, 32, self._faiss.METRIC_INNER_PRODUCT)
+        return self._faiss.IndexFlatIP(dim)
+
+    def _save(self) -> None:
+        # Replace both files atomically so a crash never leaves a half-written index
+        tmp_index_path = f"{self._index_path}.tmp"
+        self._faiss.write_index(self.index, tmp_index_path)
+        os.replace(tmp_index_path, self._index_path)
+        tmp_path = f"{self._meta_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"ids": self.ids, "metadatas": self.metadatas}, f)
+        os.replace(tmp_path, self._meta_path)
+
+    def add(self, ids: List[str], embeddings, metadatas: Optional[List[Dict[str, Any]]] = None, **_) -> None:
+        vectors = _normalized(embeddings)
+        metadatas = metadatas or [None] * len(ids)
+        # Skip stored ids, and keep only the last occurrence of an id repeated
+        # within the batch so the index and the id table stay aligned
+        latest: Dict[str, int] = {}
+        for i, doc_id in enumerate(ids):
+            if doc_id not in self._positions:
+                latest[doc_id] = i
+        new = list(latest.values())
+        if not new:
+            return
+        if self.index is None:
+            self.index = self._new_index(vectors.shape[1])
+        self.index.add(vectors[new])
+        for i in new:
+            self._positions[ids[i]] = len(self.ids)
+            self.ids.append(ids[i])
+            self.metadatas.append(metadatas[i])
+        self._save()
+
+    def get(self, ids: Optional[List[str]] = None, include: Optional[List[str]] = None, **_) -> Dict[str, Any]:
+        found = self.ids if ids is None else [doc_id for doc_id in ids if doc_id in self._positions]
+        result: Dict[str, Any] = {"ids": list(found)}
+        if include is None or "metadatas" in include:
+            result["metadatas"] = [self.metadatas[self._positions[doc_id]] for doc_id in found]
+        return result
+
+    def query(self, query_embeddings, n_results: int = 10, **_) -> Dict[str, Any]:
+        if self.index is None or not self.ids:
+            empty = [[] for _ in range(len(query_embeddings))]
+            return {"ids": empty, "distances": empty, "metadatas": empty}
+        scores, positions = self.index.search(_normalized(query_embeddings), min(n_results, len(self.ids)))
+        result: Dict[str, Any] = {"ids": [], "distances": [], "metadatas": []}
+        for row_scores, row_positions in zip(scores, positions):
+            hits = [(s, p) for s, p in zip(row_scores, row_positions) if p >= 0]
+            result["ids"].append([self.ids[p] for _, p in hits])
+            result["distances"].append([float(1.0 - s) for s, _ in hits])
+            result["metadatas"].append([self.metadatas[p] for _, p in hits])
+        return result
+
+
+class SqliteVecCollection:
+    """
+    Chroma-compatible collection stored in a single SQLite file.
+
+    Documents and their float32 vectors live in an ordinary table. When the
+    sqlite-vec extension can be loaded, vectors are also indexed in a vec0
+    virtual table and queries run inside SQLite; otherwise queries fall back
+    to a brute-force NumPy scan of the stored vectors. Distances are cosine
+    distances, as in Chroma's cosine space.
+    """
+
+    def __init__(self, path: str, name: str):
+        os.makedirs(path, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(path, f"{name}.sqlite"), check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "rowid INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, metadata TEXT, embedding BLOB NOT NULL)"
+        )
+        self.vec_enabled = False
+        try:
+            import sqlite_vec
+            self.conn.enable_load_extension(True)
+            sqlite_vec.load(self.conn)
+            self.conn.enable_load_extension(False)
+            self.vec_enabled = True
+        except (ImportError, AttributeError, sqlite3.OperationalError):
+            pass
+        if self.vec_enabled:
+            with self._lock, self.conn:
+                self._sync_vec_table()
+
+    def _ensure_vec_table(self, dim: int) -> None:
+        self.conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS vec_documents USING vec0(embedding float[{dim}])")
+
+    def _has_vec_table(self) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'vec_documents'"
+        ).fetchone() is not None
+
+    def _sync_vec_table(self) -> None:
+        # Rows written while sqlite-vec could not be loaded only exist in
+        # documents; index them so vec0 queries see every stored vector
+        row = self.conn.execute("SELECT embedding FROM documents LIMIT 1").fetchone()
+        if row is None:
+            return
+        self._ensure_vec_table(len(row[0]) // np.dtype(np.float32).itemsize)
+        indexed = {rowid for (rowid,) in self.conn.execute("SELECT rowid FROM vec_documents")}
+        missing = [(rowid, embedding) for rowid, embedding
+                   in self.conn.execute("SELECT rowid, embedding FROM documents ORDER BY rowid")
+                   if rowid not in indexed]
+        self.conn.executemany("INSERT INTO vec_documents(rowid, embedding) VALUES (?, ?)", missing)
+
+    def add(self, ids: List[str], embeddings, metadatas: Optional[List[Dict[str, Any]]] = None, **_) -> None:
+        vectors = _normalized(embeddings)
+        metadatas = metadatas or [None] * len(ids)
+        with self._lock, self.conn:
+            if self.vec_enabled:
+                self._ensure_vec_table(vectors.shape[1])
+            for doc_id, vector, metadata in zip(ids, vectors, metadatas):
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO documents(id, metadata, embedding) VALUES (?, ?, ?)",
+                    (doc_id, json.dumps(metadata), vector.tobytes())
+                )
+                if cursor.rowcount and self.vec_enabled:
+                    self.conn.execute("INSERT INTO vec_documents(rowid, embedding) VALUES (?, ?)",
+                                      (cursor.lastrowid, vector.tobytes()))
+
+    def get(self, ids: Optional[List[str]] = None, include: Optional[List[str]] = None, **_) -> Dict[str, Any]:
+        with self._lock:
+            if ids is None:
+                rows = self.conn.execute("SELECT id, metadata FROM documents ORDER BY rowid").fetchall()
+            else:
+                placeholders = ",".join("?" * len(ids))
+                rows = self.conn.execute(
+                    f"SELECT id, metadata FROM documents WHERE id IN ({placeholders})", list(ids)
+                ).fetchall() if ids else []
+        result: Dict[str, Any] = {"ids": [row[0] for row in rows]}
+        if include is None or "metadatas" in include:
+            result["metadatas"] = [json.loads(row[1]) for row in rows]
+        return result
+
+    def query(self, query_embeddings, n_results: int = 10, **_) -> Dict[str, Any]:
+        queries = _normalized(query_embeddings)
+        result: Dict[str, Any] = {"ids": [], "distances": [], "metadatas": []}
+        with self._lock:
+            if self.vec_enabled:
+                if not self._has_vec_table():
+                    # Nothing has been added yet
+                    for _ in queries:
+                        self._append_hits(result, [])
+                    return result
+                for q in queries:
+                    rows = self.conn.execute(
+                        "SELECT d.id, d.metadata, v.distance FROM vec_documents v "
+                        "JOIN documents d ON d.rowid = v.rowid "
+                        "WHERE v.embedding MATCH ? AND k = ? ORDER BY v.distance",
+                        (q.tobytes(), n_results)
+                    ).fetchall()
+                    # Unit vectors: L2 distance d relates to cosine distance as d^2 / 2
+                    self._append_hits(result, [(i, m, float(d) ** 2 / 2) for i, m, d in rows])
+                return result
+
+            rows = self.conn.execute("SELECT id, metadata, embedding FROM documents ORDER BY rowid").fetchall()
+        if not rows:
+            for _ in queries:
+                self._append_hits(result, [])
+            return result
+        matrix = np.frombuffer(b"".join(row[2] for row in rows), dtype=np.float32).reshape(len(rows), -1)
+        similarities = queries @ matrix.T
+        for row_similarities in similarities:
+            top = np.argsort(-row_similarities)[:n_results]
+            self._append_hits(result, [(rows[i][0], rows[i][1], float(1.0 - row_similarities[i])) for i in top])
+        return result
+
+    @staticmethod
+    def _append_hits(result: Dict[str, Any], hits) -> None:
+        result["ids"].append([doc_id for doc_id, _, _ in hits])
+        result["metadatas"].append([json.loads(metadata) for _, metadata, _ in hits])
+        result["distances"].append([distance for _, _, distance in hits])
+
+
+def open_collection(path: str, name: str):
+    """Open the collection name under path using the configured VECTOR_BACKEND."""
+    if VECTOR_BACKEND == "faiss":
+        return FaissCollection(path, name)
+    if VECTOR_BACKEND == "sqlite-vec":
+        return SqliteVecCollection(path, name)
+    import chromadb
+    return chromadb.PersistentClient(path=path).get_or_create_collection(name=name)
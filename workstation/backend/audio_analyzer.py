@@ -14,6 +14,10 @@ This module provides comprehensive audio analysis functionality including:
 import os
 import json
 import sys
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
 import numpy as np
 import librosa
 import librosa.display
@@ -22,12 +26,79 @@ from typing import Dict, List, Optional, Tuple, Any
 import warnings
 warnings.filterwarnings('ignore')
 
+# Bump when an analysis changes so stale cached results are not reused
+ANALYSIS_CACHE_VERSION = 1
+DEFAULT_ANALYSIS_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'orpheus', 'analysis')
+# Most recent section results kept in memory, shared by every analyzer in the process
+ANALYSIS_MEMORY_CACHE_SIZE = 256
+_memory_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_memory_cache_lock = threading.Lock()
+
+# Optional: numba fuses the waveform scans into one parallel compiled pass
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _mean_std(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mean and standard deviation along the last axis in a single read of x.
+    
+    The sum and the sum of squares are accumulated together (in float64, so
+    E[x^2] - E[x]^2 does not lose precision) instead of np.mean followed by
+    np.std traversing the data twice.
+    """
+    n = x.shape[-1]
+    mean = x.sum(axis=-1, dtype=np.float64) / n
+    mean_sq = np.einsum('...i,...i->...', x, x, dtype=np.float64) / n
+    return mean, np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+
+
+def _waveform_stats_numpy(x: np.ndarray, clip_threshold: float) -> Tuple[float, int, float]:
+    magnitude = np.abs(x)
+    peak = float(magnitude.max(initial=0.0))
+    clipped = int(np.count_nonzero(magnitude > clip_threshold))
+    return peak, clipped, float(np.einsum('i,i->', x, x, dtype=np.float64))
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _waveform_stats(x, clip_threshold):
+        """Return (peak amplitude, samples above clip_threshold, sum of squares) in one sweep."""
+        peak = 0.0
+        clipped = 0
+        sum_sq = 0.0
+        for i in numba.prange(x.shape[0]):
+            value = np.float64(x[i])
+            magnitude = abs(value)
+            peak = max(peak, magnitude)
+            if magnitude > clip_threshold:
+                clipped += 1
+            sum_sq += value * value
+        return peak, clipped, sum_sq
+else:
+    _waveform_stats = _waveform_stats_numpy
+
+
+def waveform_stats(audio_data: np.ndarray, clip_threshold: float = 0.99) -> Tuple[float, int, float]:
+    """
+    Peak amplitude, clipped sample count and sum of squares of a waveform.
+    
+    All three come from a single pass over the samples instead of separate
+    np.abs / comparison / square temporaries.
+    """
+    return _waveform_stats(np.ascontiguousarray(audio_data).ravel(), clip_threshold)
+
+
 class EnhancedAudioAnalyzer:
     """
     Comprehensive audio analyzer with advanced features for music production.
     """
     
-    def __init__(self, sample_rate: int = 44100, hop_length: int = 512, n_fft: int = 2048):
+    def __init__(self, sample_rate: int = 44100, hop_length: int = 512, n_fft: int = 2048,
+                 cache_dir: Optional[str] = None, use_cache: bool = True):
         """
         Initialize the Enhanced Audio Analyzer.
         
@@ -35,68 +106,103 @@ class EnhancedAudioAnalyzer:
             sample_rate (int): The sample rate of the audio to analyze
             hop_length (int): Number of samples between successive frames
             n_fft (int): Length of the FFT window
+            cache_dir (str, optional): Directory for cached analysis results
+                (default ~/.cache/orpheus/analysis)
+            use_cache (bool): Reuse results for audio that was analyzed before
         """
         self.sample_rate = sample_rate
         self.hop_length = hop_length
         self.n_fft = n_fft
         self.last_analysis = None
         self.export_dir = None
+        self.cache_dir = cache_dir or DEFAULT_ANALYSIS_CACHE_DIR
+        self.use_cache = use_cache
         
-    def analyze_spectral_features(self, audio_data: np.ndarray) -> Dict[str, Any]:
+    def power_spectrogram(self, audio_data: np.ndarray) -> np.ndarray:
+        """
+        Compute the power spectrogram |STFT|^2 shared by the spectral, harmonic
+        and fingerprint features.
+        
+        Args:
+            audio_data (np.ndarray): Audio time series
+            
+        Returns:
+            np.ndarray: Power spectrogram of shape (1 + n_fft/2, frames)
+        """
+        D = librosa.stft(audio_data, n_fft=self.n_fft, hop_length=self.hop_length)
+        return D.real ** 2 + D.imag ** 2
+    
+    def _mfcc(self, S_power: np.ndarray, n_mfcc: int = 13) -> np.ndarray:
+        mel = librosa.feature.melspectrogram(S=S_power, sr=self.sample_rate)
+        return librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=n_mfcc)
+    
+    def analyze_spectral_features(self, audio_data: np.ndarray, S_power: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """
         Analyze spectral features of the audio.
         
         Args:
             audio_data (np.ndarray): Audio time series
+            S_power (np.ndarray, optional): Precomputed power_spectrogram(audio_data)
             
         Returns:
             Dict containing spectral analysis results
         """
         results = {}
         
+        # One STFT feeds every spectral feature below
+        if S_power is None:
+            S_power = self.power_spectrogram(audio_data)
+        S = np.sqrt(S_power)
+        
         # MFCC features
-        mfccs = librosa.feature.mfcc(y=audio_data, sr=self.sample_rate, n_mfcc=13)
+        mfccs = self._mfcc(S_power)
+        mfccs_mean, mfccs_std = _mean_std(mfccs)
         results['mfcc'] = {
-            'mean': np.mean(mfccs, axis=1).tolist(),
-            'std': np.std(mfccs, axis=1).tolist(),
-            'shape': mfccs.shape
+            'mean': mfccs_mean.tolist(),
+            'std': mfccs_std.tolist(),
+            'shape': list(mfccs.shape)
         }
         
         # Spectral centroid
-        spectral_centroids = librosa.feature.spectral_centroid(y=audio_data, sr=self.sample_rate)[0]
+        spectral_centroids = librosa.feature.spectral_centroid(S=S, sr=self.sample_rate)[0]
+        spectral_centroids_mean, spectral_centroids_std = _mean_std(spectral_centroids)
         results['spectral_centroid'] = {
-            'mean': float(np.mean(spectral_centroids)),
-            'std': float(np.std(spectral_centroids)),
+            'mean': float(spectral_centroids_mean),
+            'std': float(spectral_centroids_std),
             'min': float(np.min(spectral_centroids)),
             'max': float(np.max(spectral_centroids))
         }
         
         # Spectral rolloff
-        spectral_rolloff = librosa.feature.spectral_rolloff(y=audio_data, sr=self.sample_rate)[0]
+        spectral_rolloff = librosa.feature.spectral_rolloff(S=S, sr=self.sample_rate)[0]
+        spectral_rolloff_mean, spectral_rolloff_std = _mean_std(spectral_rolloff)
         results['spectral_rolloff'] = {
-            'mean': float(np.mean(spectral_rolloff)),
-            'std': float(np.std(spectral_rolloff))
+            'mean': float(spectral_rolloff_mean),
+            'std': float(spectral_rolloff_std)
         }
         
         # Zero crossing rate
-        zcr = librosa.feature.zero_crossing_rate(audio_data)[0]
+        zcr = librosa.feature.zero_crossing_rate(audio_data, frame_length=self.n_fft, hop_length=self.hop_length)[0]
+        zcr_mean, zcr_std = _mean_std(zcr)
         results['zero_crossing_rate'] = {
-            'mean': float(np.mean(zcr)),
-            'std': float(np.std(zcr))
+            'mean': float(zcr_mean),
+            'std': float(zcr_std)
         }
         
         # Spectral bandwidth
-        spectral_bandwidth = librosa.feature.spectral_bandwidth(y=audio_data, sr=self.sample_rate)[0]
+        spectral_bandwidth = librosa.feature.spectral_bandwidth(S=S, sr=self.sample_rate)[0]
+        spectral_bandwidth_mean, spectral_bandwidth_std = _mean_std(spectral_bandwidth)
         results['spectral_bandwidth'] = {
-            'mean': float(np.mean(spectral_bandwidth)),
-            'std': float(np.std(spectral_bandwidth))
+            'mean': float(spectral_bandwidth_mean),
+            'std': float(spectral_bandwidth_std)
         }
         
         # Spectral contrast
-        spectral_contrast = librosa.feature.spectral_contrast(y=audio_data, sr=self.sample_rate)
+        spectral_contrast = librosa.feature.spectral_contrast(S=S, sr=self.sample_rate)
+        spectral_contrast_mean, spectral_contrast_std = _mean_std(spectral_contrast)
         results['spectral_contrast'] = {
-            'mean': np.mean(spectral_contrast, axis=1).tolist(),
-            'std': np.std(spectral_contrast, axis=1).tolist()
+            'mean': spectral_contrast_mean.tolist(),
+            'std': spectral_contrast_std.tolist()
         }
         
         return results
@@ -113,17 +219,31 @@ class EnhancedAudioAnalyzer:
         """
         results = {}
         
+        # One log-mel spectrogram feeds both onset envelopes. beat_track
+        # aggregates frequency bands with the median and onset_detect with
+        # the mean, so each keeps its own envelope but neither recomputes
+        # the STFT and mel projection.
+        S_db = librosa.power_to_db(librosa.feature.melspectrogram(
+            y=audio_data, sr=self.sample_rate, n_fft=self.n_fft, hop_length=self.hop_length))
+        beat_env = librosa.onset.onset_strength(S=S_db, sr=self.sample_rate, hop_length=self.hop_length,
+                                                aggregate=np.median)
+        onset_env = librosa.onset.onset_strength(S=S_db, sr=self.sample_rate, hop_length=self.hop_length)
+        
         # Tempo and beat tracking
-        tempo, beats = librosa.beat.beat_track(y=audio_data, sr=self.sample_rate)
+        tempo, beats = librosa.beat.beat_track(onset_envelope=beat_env, sr=self.sample_rate,
+                                               hop_length=self.hop_length)
+        beat_times = librosa.frames_to_time(beats, sr=self.sample_rate, hop_length=self.hop_length)
         results['tempo'] = {
-            'bpm': float(tempo),
-            'beat_times': librosa.frames_to_time(beats, sr=self.sample_rate).tolist(),
+            # librosa >= 0.10 returns tempo as a one-element array
+            'bpm': float(np.atleast_1d(tempo)[0]),
+            'beat_times': beat_times.tolist(),
             'num_beats': len(beats)
         }
         
         # Onset detection
-        onset_frames = librosa.onset.onset_detect(y=audio_data, sr=self.sample_rate)
-        onset_times = librosa.frames_to_time(onset_frames, sr=self.sample_rate)
+        onset_frames = librosa.onset.onset_detect(onset_envelope=onset_env, sr=self.sample_rate,
+                                                  hop_length=self.hop_length)
+        onset_times = librosa.frames_to_time(onset_frames, sr=self.sample_rate, hop_length=self.hop_length)
         results['onsets'] = {
             'times': onset_times.tolist(),
             'count': len(onset_times)
@@ -131,7 +251,7 @@ class EnhancedAudioAnalyzer:
         
         # Rhythmic pattern analysis
         if len(beats) > 1:
-            beat_intervals = np.diff(librosa.frames_to_time(beats, sr=self.sample_rate))
+            beat_intervals = np.diff(beat_times)
             results['rhythm_stability'] = {
                 'beat_interval_mean': float(np.mean(beat_intervals)),
                 'beat_interval_std': float(np.std(beat_intervals)),
@@ -140,23 +260,28 @@ class EnhancedAudioAnalyzer:
         
         return results
     
-    def analyze_harmonic_features(self, audio_data: np.ndarray) -> Dict[str, Any]:
+    def analyze_harmonic_features(self, audio_data: np.ndarray, S_power: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """
         Analyze harmonic and tonal features of the audio.
         
         Args:
             audio_data (np.ndarray): Audio time series
+            S_power (np.ndarray, optional): Precomputed power_spectrogram(audio_data)
             
         Returns:
             Dict containing harmonic analysis results
         """
         results = {}
         
+        if S_power is None:
+            S_power = self.power_spectrogram(audio_data)
+        
         # Chroma features
-        chroma = librosa.feature.chroma_stft(y=audio_data, sr=self.sample_rate)
+        chroma = librosa.feature.chroma_stft(S=S_power, sr=self.sample_rate)
+        chroma_mean, chroma_std = _mean_std(chroma)
         results['chroma'] = {
-            'mean': np.mean(chroma, axis=1).tolist(),
-            'std': np.std(chroma, axis=1).tolist()
+            'mean': chroma_mean.tolist(),
+            'std': chroma_std.tolist()
         }
         
         # Harmonic-percussive separation
@@ -172,11 +297,13 @@ class EnhancedAudioAnalyzer:
             'percussive_ratio': float(percussive_energy / total_energy) if total_energy > 0 else 0.0
         }
         
-        # Tonnetz (tonal centroid features)
-        tonnetz = librosa.feature.tonnetz(y=librosa.effects.harmonic(audio_data), sr=self.sample_rate)
+        # Tonnetz (tonal centroid features), reusing the harmonic component
+        # from the separation above instead of running HPSS again
+        tonnetz = librosa.feature.tonnetz(y=y_harmonic, sr=self.sample_rate)
+        tonnetz_mean, tonnetz_std = _mean_std(tonnetz)
         results['tonnetz'] = {
-            'mean': np.mean(tonnetz, axis=1).tolist(),
-            'std': np.std(tonnetz, axis=1).tolist()
+            'mean': tonnetz_mean.tolist(),
+            'std': tonnetz_std.tolist()
         }
         
         return results
@@ -195,23 +322,28 @@ class EnhancedAudioAnalyzer:
         
         # RMS energy
         rms = librosa.feature.rms(y=audio_data)[0]
+        rms_mean, rms_std = _mean_std(rms)
         results['rms_energy'] = {
-            'mean': float(np.mean(rms)),
-            'std': float(np.std(rms)),
+            'mean': float(rms_mean),
+            'std': float(rms_std),
             'min': float(np.min(rms)),
             'max': float(np.max(rms))
         }
         
         # Dynamic range
         db_rms = librosa.amplitude_to_db(rms)
+        db_rms_mean, db_rms_std = _mean_std(db_rms)
         results['dynamic_range'] = {
             'range_db': float(np.max(db_rms) - np.min(db_rms)),
-            'mean_db': float(np.mean(db_rms)),
-            'std_db': float(np.std(db_rms))
+            'mean_db': float(db_rms_mean),
+            'std_db': float(db_rms_std)
         }
         
+        # Peak amplitude and energy in one pass over the waveform
+        peak_amplitude, _, sum_sq = waveform_stats(audio_data)
+        
         # Peak analysis
-        peaks, _ = scipy.signal.find_peaks(np.abs(audio_data), height=0.1 * np.max(np.abs(audio_data)))
+        peaks, _ = scipy.signal.find_peaks(np.abs(audio_data), height=0.1 * peak_amplitude)
         results['peaks'] = {
             'count': len(peaks),
             'peak_times': (peaks / self.sample_rate).tolist()[:100]  # Limit to first 100 peaks
@@ -219,10 +351,10 @@ class EnhancedAudioAnalyzer:
         
         # Loudness estimation (simplified)
         # Using RMS as a proxy for loudness
-        loudness_lufs = -0.691 + 10 * np.log10(np.mean(audio_data ** 2) + 1e-10)
+        loudness_lufs = -0.691 + 10 * np.log10(sum_sq / audio_data.size + 1e-10)
         results['loudness'] = {
             'lufs_estimate': float(loudness_lufs),
-            'peak_amplitude': float(np.max(np.abs(audio_data)))
+            'peak_amplitude': float(peak_amplitude)
         }
         
         return results
@@ -258,9 +390,8 @@ class EnhancedAudioAnalyzer:
         }
         
         # Clipping detection
-        max_amplitude = np.max(np.abs(audio_data))
         clipping_threshold = 0.99
-        clipped_samples = np.sum(np.abs(audio_data) > clipping_threshold)
+        max_amplitude, clipped_samples, _ = waveform_stats(audio_data, clipping_threshold)
         
         results['clipping_analysis'] = {
             'max_amplitude': float(max_amplitude),
@@ -285,19 +416,23 @@ class EnhancedAudioAnalyzer:
         
         return results
     
-    def generate_audio_fingerprint(self, audio_data: np.ndarray) -> Dict[str, Any]:
+    def generate_audio_fingerprint(self, audio_data: np.ndarray, S_power: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """
         Generate a fingerprint for the audio that can be used for similarity analysis.
         
         Args:
             audio_data (np.ndarray): Audio time series
+            S_power (np.ndarray, optional): Precomputed power_spectrogram(audio_data)
             
         Returns:
             Dict containing fingerprint data
         """
+        if S_power is None:
+            S_power = self.power_spectrogram(audio_data)
+        
         # Generate a compact representation using chroma and MFCC features
-        chroma = librosa.feature.chroma_stft(y=audio_data, sr=self.sample_rate)
-        mfcc = librosa.feature.mfcc(y=audio_data, sr=self.sample_rate, n_mfcc=13)
+        chroma = librosa.feature.chroma_stft(S=S_power, sr=self.sample_rate)
+        mfcc = self._mfcc(S_power)
         
         # Create fingerprint as concatenation of mean features
         fingerprint = np.concatenate([
@@ -315,6 +450,10 @@ class EnhancedAudioAnalyzer:
         """
         Perform comprehensive audio analysis.
         
+        Each analysis type is cached by the content hash of audio_data, in
+        memory and under cache_dir, so repeated requests for the same audio
+        skip the librosa pipeline.
+        
         Args:
             audio_data (np.ndarray): Audio time series
             analysis_types (List[str], optional): Types of analysis to perform
@@ -340,29 +479,97 @@ class EnhancedAudioAnalyzer:
             }
         }
         
+        key = self._cache_key(audio_data) if self.use_cache else None
+        if key is not None:
+            for analysis_type in analysis_types:
+                cached = self._load_cached(key, analysis_type)
+                if cached is not None:
+                    results[analysis_type] = cached
+        
+        # Spectral, harmonic and fingerprint features share one STFT
+        pending = [t for t in analysis_types if t not in results]
+        S_power = None
+        if {'spectral', 'harmonic', 'fingerprint'} & set(pending):
+            S_power = self.power_spectrogram(audio_data)
+        
         # Perform requested analyses
-        if 'spectral' in analysis_types:
-            results['spectral'] = self.analyze_spectral_features(audio_data)
+        if 'spectral' in pending:
+            results['spectral'] = self.analyze_spectral_features(audio_data, S_power)
             
-        if 'rhythm' in analysis_types:
+        if 'rhythm' in pending:
             results['rhythm'] = self.analyze_rhythm_features(audio_data)
             
-        if 'harmonic' in analysis_types:
-            results['harmonic'] = self.analyze_harmonic_features(audio_data)
+        if 'harmonic' in pending:
+            results['harmonic'] = self.analyze_harmonic_features(audio_data, S_power)
             
-        if 'dynamic' in analysis_types:
+        if 'dynamic' in pending:
             results['dynamic'] = self.analyze_dynamic_features(audio_data)
             
-        if 'quality' in analysis_types:
+        if 'quality' in pending:
             results['quality'] = self.analyze_audio_quality(audio_data)
             
-        if 'fingerprint' in analysis_types:
-            results['fingerprint'] = self.generate_audio_fingerprint(audio_data)
+        if 'fingerprint' in pending:
+            results['fingerprint'] = self.generate_audio_fingerprint(audio_data, S_power)
+        
+        if key is not None:
+            for analysis_type in pending:
+                if analysis_type in results:
+                    self._store_cached(key, analysis_type, results[analysis_type])
         
         # Store results for export
         self.last_analysis = results
         return results
     
+    def _cache_key(self, audio_data: np.ndarray) -> str:
+        """Content hash of the samples plus every setting that affects the results."""
+        samples = np.ascontiguousarray(audio_data)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{samples.dtype.str}|{samples.shape}|{self.sample_rate}|{self.hop_length}|"
+                      f"{self.n_fft}|{librosa.__version__}|{ANALYSIS_CACHE_VERSION}".encode())
+        digest.update(samples)
+        return digest.hexdigest()
+    
+    def _cache_path(self, key: str, analysis_type: str) -> str:
+        # One file per analysis type, so a partial analysis never invalidates the others
+        return os.path.join(self.cache_dir, f"{key}-{analysis_type}.json")
+    
+    def _load_cached(self, key: str, analysis_type: str) -> Optional[Dict[str, Any]]:
+        with _memory_cache_lock:
+            cached = _memory_cache.get((key, analysis_type))
+            if cached is not None:
+                _memory_cache.move_to_end((key, analysis_type))
+                return copy.deepcopy(cached)
+        try:
+            with open(self._cache_path(key, analysis_type)) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._remember(key, analysis_type, cached)
+        return copy.deepcopy(cached)
+    
+    def _store_cached(self, key: str, analysis_type: str, result: Dict[str, Any]):
+        # Round-trip through JSON so a fresh result and a cache hit look the same
+        serialized = json.dumps(result, default=self._json_serializer)
+        self._remember(key, analysis_type, json.loads(serialized))
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            cache_path = self._cache_path(key, analysis_type)
+            # Write to a per-thread temp file, then rename, so concurrent
+            # requests never read a half-written entry
+            tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(serialized)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass  # Caching is best effort
+    
+    def _remember(self, key: str, analysis_type: str, result: Dict[str, Any]):
+        with _memory_cache_lock:
+            _memory_cache[(key, analysis_type)] = result
+            _memory_cache.move_to_end((key, analysis_type))
+            while len(_memory_cache) > ANALYSIS_MEMORY_CACHE_SIZE:
+                _memory_cache.popitem(last=False)
+    
     def compare_audio_similarity(self, audio1: np.ndarray, audio2: np.ndarray) -> Dict[str, Any]:
         """
         Compare similarity between two audio files.
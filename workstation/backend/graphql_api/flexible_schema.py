@@ -16,6 +16,12 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
+try:
+    from .json_store import load_json
+except ImportError:
+    # Loaded as a top-level module (graphql_api on sys.path)
+    from json_store import load_json
+
 class AudioLibraryService:
     """Service class for audio library operations"""
     
@@ -29,8 +35,7 @@ class AudioLibraryService:
     def load_audio_library(self) -> Dict[str, Any]:
         """Load audio library data from JSON file"""
         try:
-            with open(self.audio_library_path, 'r') as f:
-                return json.load(f)
+            return load_json(self.audio_library_path)
         except (FileNotFoundError, json.JSONDecodeError) as e:
             print(f"Error loading audio library: {e}")
             return {"audio_library": {"files": []}}
@@ -0,0 +1,89 @@
+"""
+JSON file access for the GraphQL API
+
+Resolvers read the library index on every request. Parsing goes through
+orjson when it is installed; a fresh parse of the index is cheaper than
+deep-copying a cached document for callers that mutate it.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _parse(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def load_json(path: str) -> Any:
+    """
+    Load and parse a JSON file.
+
+    Args:
+        path (str): Path to the JSON file
+
+    Returns:
+        The parsed document, owned by the caller and safe to mutate
+
+    Raises:
+        FileNotFoundError, ValueError: If the file is missing or not valid JSON
+    """
+    with open(path, 'rb') as f:
+        return _parse(f.read())
+
+
+def atomic_write_json(path: str, data: Any) -> None:
+    """
+    Write data to a JSON file without ever leaving a truncated file behind.
+
+    The document is written to a uniquely named temp file in the same
+    directory, fsynced, and then moved over the target with os.replace, so
+    concurrent writers never share a temp file.
+
+    Args:
+        path (str): Path to the JSON file
+        data: JSON-serializable document
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        # mkstemp creates the file as 0600; keep the target's permissions
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# Serializes writers of the same files within the process
+_lock = threading.Lock()
+
+
+def save_json(path: str, data: Any) -> None:
+    """
+    Atomically write data to a JSON file.
+
+    Args:
+        path (str): Path to the JSON file
+        data: JSON-serializable document
+    """
+    with _lock:
+        atomic_write_json(path, data)
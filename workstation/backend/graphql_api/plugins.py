@@ -15,6 +15,11 @@ from typing import Dict, Any, Optional, List
 import requests
 import threading
 import time
+try:
+    from .json_store import save_json
+except ImportError:
+    # Loaded as a top-level module (graphql_api on sys.path)
+    from json_store import save_json
 
 # Plugin System Types
 class PluginStatus(graphene.Enum):
@@ -137,8 +142,8 @@ class PluginManager:
                 'updated_at': datetime.now().isoformat()
             }
             
-            with open(plugins_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            # Takes the store lock, so concurrent saves are applied one at a time
+            save_json(plugins_file, data)
         except Exception as e:
             print(f"Error saving plugins: {e}")
     
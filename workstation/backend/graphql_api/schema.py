@@ -3,6 +3,15 @@ from datetime import datetime
 import os
 import json
 from graphene import ObjectType, String, ID, Float, Int, List, Enum, Field, Boolean
+try:
+    from .json_store import load_json, save_json
+except ImportError:
+    # Loaded as a top-level module (graphql_api on sys.path)
+    from json_store import load_json, save_json
+
+# Path to audio library index file
+AUDIO_LIBRARY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+                                  'data', 'audio_library_index.json')
 
 # Audio format enum
 class AudioFormat(graphene.Enum):
@@ -75,66 +84,63 @@ class Query(ObjectType):
     
     def resolve_audio_library(root, info):
         # Load audio library from JSON file
-        lib_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'audio_library_index.json')
+        lib_path = AUDIO_LIBRARY_PATH
         try:
-            with open(lib_path, 'r') as f:
-                data = json.load(f)
-                audio_library = data.get('audio_library', {})
-                
-                # Process the files to add required fields
-                files = audio_library.get('files', [])
-                location = audio_library.get('location', './data/')
-                updated = audio_library.get('updated', datetime.now().isoformat())
-                
-                # Add the ID field for each file since it's not stored in the JSON
-                for idx, file in enumerate(files):
-                    file['id'] = str(idx)
-                    file['path'] = os.path.join(location, file['filename'])
-                    file['created_at'] = datetime.now().isoformat()
-                    file['updated_at'] = updated
-                
-                # Return the modified audio library data
-                audio_library['files'] = files
-                return audio_library
+            data = load_json(lib_path)
+            audio_library = data.get('audio_library', {})
+            
+            # Process the files to add required fields
+            files = audio_library.get('files', [])
+            location = audio_library.get('location', './data/')
+            updated = audio_library.get('updated', datetime.now().isoformat())
+            
+            # Add the ID field for each file since it's not stored in the JSON
+            for idx, file in enumerate(files):
+                file['id'] = str(idx)
+                file['path'] = os.path.join(location, file['filename'])
+                file['created_at'] = datetime.now().isoformat()
+                file['updated_at'] = updated
+            
+            # Return the modified audio library data
+            audio_library['files'] = files
+            return audio_library
         except Exception as e:
             print(f"Error loading audio library: {e}")
             return None
     
     def resolve_audio_file(root, info, id):
-        lib_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'audio_library_index.json')
+        lib_path = AUDIO_LIBRARY_PATH
         try:
-            with open(lib_path, 'r') as f:
-                data = json.load(f)
-                for idx, file in enumerate(data.get('audio_library', {}).get('files', [])):
-                    if str(idx) == id:
-                        # Add the ID field since it's not stored in the JSON
-                        file['id'] = id
-                        file['path'] = os.path.join(data.get('audio_library', {}).get('location', './data/'), file['filename'])
-                        file['created_at'] = datetime.now().isoformat()
-                        file['updated_at'] = data.get('audio_library', {}).get('updated', datetime.now().isoformat())
-                        return file
-                return None
+            data = load_json(lib_path)
+            for idx, file in enumerate(data.get('audio_library', {}).get('files', [])):
+                if str(idx) == id:
+                    # Add the ID field since it's not stored in the JSON
+                    file['id'] = id
+                    file['path'] = os.path.join(data.get('audio_library', {}).get('location', './data/'), file['filename'])
+                    file['created_at'] = datetime.now().isoformat()
+                    file['updated_at'] = data.get('audio_library', {}).get('updated', datetime.now().isoformat())
+                    return file
+            return None
         except Exception as e:
             print(f"Error loading audio file with ID {id}: {e}")
             return None
     
     def resolve_audio_files(root, info):
-        lib_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'audio_library_index.json')
+        lib_path = AUDIO_LIBRARY_PATH
         try:
-            with open(lib_path, 'r') as f:
-                data = json.load(f)
-                files = data.get('audio_library', {}).get('files', [])
-                location = data.get('audio_library', {}).get('location', './data/')
-                updated = data.get('audio_library', {}).get('updated', datetime.now().isoformat())
-                
-                # Add the ID field for each file since it's not stored in the JSON
-                for idx, file in enumerate(files):
-                    file['id'] = str(idx)
-                    file['path'] = os.path.join(location, file['filename'])
-                    file['created_at'] = datetime.now().isoformat()  # We don't have actual creation dates
-                    file['updated_at'] = updated
-                
-                return files
+            data = load_json(lib_path)
+            files = data.get('audio_library', {}).get('files', [])
+            location = data.get('audio_library', {}).get('location', './data/')
+            updated = data.get('audio_library', {}).get('updated', datetime.now().isoformat())
+            
+            # Add the ID field for each file since it's not stored in the JSON
+            for idx, file in enumerate(files):
+                file['id'] = str(idx)
+                file['path'] = os.path.join(location, file['filename'])
+                file['created_at'] = datetime.now().isoformat()  # We don't have actual creation dates
+                file['updated_at'] = updated
+            
+            return files
         except Exception as e:
             print(f"Error loading audio files: {e}")
             return []
@@ -147,10 +153,9 @@ class AddAudioFile(graphene.Mutation):
     audio_file = Field(lambda: AudioFile)
     
     def mutate(root, info, input):
-        lib_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'audio_library_index.json')
+        lib_path = AUDIO_LIBRARY_PATH
         try:
-            with open(lib_path, 'r') as f:
-                data = json.load(f)
+            data = load_json(lib_path)
             
             # Add new audio file
             new_file = {
@@ -164,8 +169,7 @@ class AddAudioFile(graphene.Mutation):
             data['audio_library']['updated'] = datetime.now().isoformat()
             
             # Save back to JSON
-            with open(lib_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            save_json(lib_path, data)
             
             # Return the newly created file with generated ID
             new_id = str(len(data['audio_library']['files']) - 1)
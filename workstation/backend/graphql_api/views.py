@@ -27,6 +27,9 @@ except ImportError as e:
         print(f"✗ Error: Could not import any schema: {e2}")
         graphql_enabled = False
 
+# Largest GraphQL request body accepted; bigger bodies are rejected before parsing
+MAX_QUERY_BYTES = 64 * 1024
+
 # Create a Blueprint for GraphQL
 graphql_blueprint = Blueprint('graphql', __name__)
 
@@ -43,6 +46,10 @@ def graphql_endpoint():
     
     try:
         if request.method == 'POST':
+            # Reject oversized bodies before handing them to the JSON parser
+            if (request.content_length or 0) > MAX_QUERY_BYTES:
+                return jsonify({'error': f'Request body exceeds {MAX_QUERY_BYTES} bytes'}), 413
+            
             # Handle POST requests with JSON body
             data = request.get_json()
             if not data:
@@ -59,6 +66,13 @@ def graphql_endpoint():
         if not query:
             return jsonify({'error': 'No query provided'}), 400
         
+        if not isinstance(query, str):
+            return jsonify({'error': 'Query must be a string'}), 400
+        
+        # Measure the encoded size; len() would count characters, not bytes
+        if len(query.encode('utf-8')) > MAX_QUERY_BYTES:
+            return jsonify({'error': f'Query exceeds {MAX_QUERY_BYTES} bytes'}), 413
+        
         # Check if this is a flexible schema (dict-based) or graphene schema
         if hasattr(schema, 'execute'):
             # This is a graphene schema
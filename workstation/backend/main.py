@@ -20,6 +20,7 @@ Installation:
 import sys
 import os
 import json
+import base64
 import subprocess
 import importlib.util
 
@@ -273,6 +274,30 @@ class NumpyEncoder(json.JSONEncoder):
             return float(obj)
         return super(NumpyEncoder, self).default(obj)
 
+# Encodings accepted for matrix-valued visualization data
+ARRAY_ENCODINGS = ('json', 'float16', 'int8')
+
+def encode_array(array, encoding='json'):
+    """
+    Encode a feature matrix for a JSON response.
+    
+    'json' returns nested lists. 'float16' returns the base64 of the
+    half-precision buffer. 'int8' returns the base64 of a symmetric int8
+    quantization, decoded as value = q * scale. Compact encodings carry
+    their shape and dtype so clients can rebuild the array.
+    """
+    if encoding == 'float16':
+        data = np.ascontiguousarray(array, dtype=np.float16)
+        return {"data": base64.b64encode(data.tobytes()).decode('ascii'),
+                "shape": list(data.shape), "dtype": "float16"}
+    if encoding == 'int8':
+        peak = float(np.max(np.abs(array))) if np.size(array) else 0.0
+        scale = peak / 127 if peak > 0 else 1.0
+        data = np.round(np.asarray(array) / scale).astype(np.int8)
+        return {"data": base64.b64encode(data.tobytes()).decode('ascii'),
+                "shape": list(data.shape), "dtype": "int8", "scale": scale}
+    return np.asarray(array).tolist()
+
 app = Flask(__name__)
 CORS(app)
 app.json_encoder = NumpyEncoder
@@ -282,22 +307,27 @@ EXPORT_DIR = os.path.join(os.path.dirname(__file__), 'analysis_exports')
 if not os.path.exists(EXPORT_DIR):
     os.makedirs(EXPORT_DIR)
 
+# Optional feature toggles; disabled features skip their imports and routes entirely
+ENABLE_GRAPHQL_API = os.environ.get('ENABLE_GRAPHQL_API', 'true').lower() == 'true'
+ENABLE_PLUGIN_SYSTEM = os.environ.get('ENABLE_PLUGIN_SYSTEM', 'true').lower() == 'true'
+
 # Register GraphQL Blueprint
-try:
-    import sys
-    import os
-    # Add project root directory to path for proper imports
-    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-    if project_root not in sys.path:
-        sys.path.insert(0, project_root)
-    
-    # Use local import with renamed directory
-    from graphql_api.views import graphql_blueprint
-    app.register_blueprint(graphql_blueprint, url_prefix='/api')
-    print("GraphQL API registered at /api/graphql")
-except ImportError as e:
-    print(f"Failed to load GraphQL API: {e}")
-    print("GraphQL API not available - install graphene and flask-graphql to enable")
+if ENABLE_GRAPHQL_API:
+    try:
+        # Add project root directory to path for proper imports
+        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+        if project_root not in sys.path:
+            sys.path.insert(0, project_root)
+        
+        # Use local import with renamed directory
+        from graphql_api.views import graphql_blueprint
+        app.register_blueprint(graphql_blueprint, url_prefix='/api')
+        print("GraphQL API registered at /api/graphql")
+    except ImportError as e:
+        print(f"Failed to load GraphQL API: {e}")
+        print("GraphQL API not available - install graphene and flask-graphql to enable")
+else:
+    print("GraphQL API disabled (ENABLE_GRAPHQL_API=false)")
 
 @app.route('/')
 def hello_world():
@@ -676,8 +706,11 @@ def generate_visualization():
         if file.filename == '':
             return jsonify({"error": "No file selected"}), 400
         
-        # Get visualization type
+        # Get visualization type and matrix encoding
         viz_type = request.form.get('type', 'spectrogram')
+        encoding = request.form.get('encoding', 'json')
+        if encoding not in ARRAY_ENCODINGS:
+            return jsonify({"error": f"Unsupported encoding: {encoding}"}), 400
         
         # Save uploaded file temporarily
         temp_path = os.path.join(EXPORT_DIR, 'temp_viz_' + file.filename)
@@ -693,19 +726,23 @@ def generate_visualization():
                 # Generate spectrogram
                 stft = librosa.stft(audio_data)
                 spectrogram = np.abs(stft)
-                results['spectrogram'] = spectrogram.tolist()
+                results['spectrogram'] = encode_array(spectrogram, encoding)
                 results['frequencies'] = librosa.fft_frequencies(sr=sr).tolist()
                 results['times'] = librosa.frames_to_time(np.arange(spectrogram.shape[1]), sr=sr).tolist()
                 
             elif viz_type == 'waveform':
-                # Generate waveform data
+                # Generate waveform data. Sample times follow from sample_rate,
+                # so the per-sample time axis is only sent when asked for
                 results['waveform'] = audio_data.tolist()
-                results['time'] = np.linspace(0, len(audio_data)/sr, len(audio_data)).tolist()
+                results['sample_rate'] = sr
+                results['duration'] = len(audio_data) / sr
+                if request.form.get('include_time', 'false').lower() == 'true':
+                    results['time'] = (np.arange(len(audio_data)) / sr).tolist()
                 
             elif viz_type == 'chromagram':
                 # Generate chromagram
                 chroma = librosa.feature.chroma_stft(y=audio_data, sr=sr)
-                results['chromagram'] = chroma.tolist()
+                results['chromagram'] = encode_array(chroma, encoding)
                 results['pitch_classes'] = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
                 results['times'] = librosa.frames_to_time(np.arange(chroma.shape[1]), sr=sr).tolist()
             
@@ -734,45 +771,68 @@ if __name__ == '__main__':
     port = int(os.environ.get('BACKEND_PORT', 5001))
     debug = os.environ.get('DEVELOPMENT', 'false').lower() == 'true'
     
-    # Initialize plugin system
-    try:
-        from graphql_api.plugins import plugin_manager
-        print(f"✓ Plugin system initialized. Next available port: {plugin_manager.next_port}")
-    except ImportError:
-        print("⚠ Plugin system not available")
-    
-    # Add plugin status endpoint
-    @app.route('/api/system/status')
-    def system_status():
-        """Get system and plugin status"""
+    if ENABLE_PLUGIN_SYSTEM:
+        # Initialize plugin system
         try:
             from graphql_api.plugins import plugin_manager
-            plugins = plugin_manager.list_plugins()
-            
-            return jsonify({
-                "status": "running",
-                "backend_port": port,
-                "plugin_count": len(plugins),
-                "next_plugin_port": plugin_manager.next_port,
-                "plugins": [
-                    {
-                        "id": p.get('id'),
-                        "name": p.get('name'),
-                        "status": p.get('status'),
-                        "port": p.get('backend_port')
-                    } for p in plugins
-                ]
-            })
-        except Exception as e:
-            return jsonify({
-                "status": "running",
-                "backend_port": port,
-                "plugin_system": "unavailable",
-                "error": str(e)
-            })
+            print(f"✓ Plugin system initialized. Next available port: {plugin_manager.next_port}")
+        except ImportError:
+            print("⚠ Plugin system not available")
+        
+        # Add plugin status endpoint
+        @app.route('/api/system/status')
+        def system_status():
+            """Get system and plugin status"""
+            try:
+                from graphql_api.plugins import plugin_manager
+                plugins = plugin_manager.list_plugins()
+                
+                return jsonify({
+                    "status": "running",
+                    "backend_port": port,
+                    "plugin_count": len(plugins),
+                    "next_plugin_port": plugin_manager.next_port,
+                    "plugins": [
+                        {
+                            "id": p.get('id'),
+                            "name": p.get('name'),
+                            "status": p.get('status'),
+                            "port": p.get('backend_port')
+                        } for p in plugins
+                    ]
+                })
+            except Exception as e:
+                return jsonify({
+                    "status": "running",
+                    "backend_port": port,
+                    "plugin_system": "unavailable",
+                    "error": str(e)
+                })
+    else:
+        print("⚠ Plugin system disabled (ENABLE_PLUGIN_SYSTEM=false)")
     
     print(f"🚀 Starting Orpheus Engine Backend on port {port}")
     if debug:
         print("🔧 Debug mode enabled")
-    
-    app.run(host='0.0.0.0', port=port, debug=debug)
+        app.run(host='0.0.0.0', port=port, debug=debug)
+    elif importlib.util.find_spec("gunicorn") is not None:
+        # Production: serve through gunicorn's threaded workers instead of the
+        # Werkzeug development server. Workers default to 1 because the plugin
+        # manager keeps its registry in process memory.
+        from gunicorn.app.base import BaseApplication
+        
+        class OrpheusServer(BaseApplication):
+            def load_config(self):
+                self.cfg.set('bind', f"0.0.0.0:{port}")
+                self.cfg.set('workers', int(os.environ.get('BACKEND_WORKERS', 1)))
+                self.cfg.set('threads', int(os.environ.get('BACKEND_THREADS', 8)))
+                self.cfg.set('worker_class', 'gthread')
+                self.cfg.set('keepalive', 5)
+            
+            def load(self):
+                return app
+        
+        print("⚙️ Serving with gunicorn")
+        OrpheusServer().run()
+    else:
+        app.run(host='0.0.0.0', port=port, debug=debug, threaded=True)
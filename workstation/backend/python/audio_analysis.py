@@ -8,6 +8,10 @@ This module provides audio analysis functionality for the Orpheus Engine Worksta
 import os
 import json
 import sys
+import atexit
+import contextlib
+import functools
+import pickle
 from pathlib import Path
 
 # Import dependencies with error handling
@@ -22,6 +26,7 @@ except ImportError:
 try:
     import librosa
     import librosa.display
+    import scipy.fft
 except ImportError:
     print("ERROR: librosa package not found. Please install it with:")
     print("pip install librosa")
@@ -36,6 +41,227 @@ except ImportError:
     print("or run: pip install -r requirements.txt")
     sys.exit(1)
 
+# Optional: orjson serializes NumPy scalars and arrays natively for JSON export
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional: pyFFTW (FFTW3) replaces pocketfft as the scipy.fft backend
+try:
+    import pyfftw
+    import pyfftw.interfaces.scipy_fft
+except ImportError:
+    pyfftw = None
+
+# Optional: numba fuses the waveform reductions into a single compiled pass
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# FFT window length shared by every spectrogram-based feature
+N_FFT = 2048
+HOP_LENGTH = 512
+
+# librosa runs its FFTs through scipy.fft (pocketfft), which can spread the
+# batched frame transforms across threads; -1 means one per CPU
+FFT_WORKERS = int(os.environ.get('ANALYSIS_FFT_WORKERS', -1))
+
+# FFTW plans ("wisdom") are persisted here so later runs skip plan search
+FFTW_WISDOM_PATH = Path(os.environ.get('ANALYSIS_FFTW_WISDOM',
+                                       Path.home() / '.cache' / 'orpheus' / 'fftw_wisdom.pkl'))
+
+
+def _save_fftw_wisdom():
+    try:
+        FFTW_WISDOM_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(FFTW_WISDOM_PATH, 'wb') as f:
+            pickle.dump(pyfftw.export_wisdom(), f)
+    except OSError:
+        pass
+
+
+if pyfftw is not None:
+    pyfftw.config.NUM_THREADS = os.cpu_count() if FFT_WORKERS < 0 else FFT_WORKERS
+    pyfftw.interfaces.cache.enable()
+    pyfftw.interfaces.cache.set_keepalive_time(60.0)
+    try:
+        with open(FFTW_WISDOM_PATH, 'rb') as f:
+            pyfftw.import_wisdom(pickle.load(f))
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        pass
+    atexit.register(_save_fftw_wisdom)
+
+
+@contextlib.contextmanager
+def fft_backend():
+    """
+    Run the enclosed librosa FFTs with the fastest available backend.
+    
+    Uses pyFFTW when installed, otherwise scipy's pocketfft spread over
+    FFT_WORKERS threads.
+    """
+    if pyfftw is not None:
+        with scipy.fft.set_backend(pyfftw.interfaces.scipy_fft):
+            yield
+    else:
+        with scipy.fft.set_workers(FFT_WORKERS):
+            yield
+
+# Where the shared STFT runs: 'auto' uses CUDA through torch when a GPU is
+# present, 'cpu' always uses librosa
+ANALYSIS_DEVICE = os.environ.get('ANALYSIS_DEVICE', 'auto').lower()
+
+
+@functools.lru_cache(maxsize=None)
+def _cuda_device():
+    """Return the torch CUDA device, or None when torch or a GPU is unavailable."""
+    if ANALYSIS_DEVICE == 'cpu':
+        return None
+    try:
+        import torch
+    except ImportError:
+        return None
+    return torch.device('cuda') if torch.cuda.is_available() else None
+
+
+@functools.lru_cache(maxsize=32)
+def mel_basis(sample_rate, n_fft=N_FFT, n_mels=128):
+    """
+    Return the (read-only) mel filterbank for the given configuration.
+    
+    librosa rebuilds the filterbank on every melspectrogram call; caching it
+    makes repeated analyses at the same sample rate skip that setup.
+    """
+    basis = librosa.filters.mel(sr=sample_rate, n_fft=n_fft, n_mels=n_mels)
+    basis.flags.writeable = False
+    return basis
+
+
+def stft_magnitude(audio, n_fft=N_FFT, hop_length=HOP_LENGTH):
+    """
+    Compute the magnitude spectrogram with librosa.stft's default framing.
+    
+    Runs on the GPU via torch.stft when CUDA is available (centered, zero
+    padded, periodic Hann window, as librosa does) and falls back to
+    librosa on the CPU.
+    
+    Args:
+        audio (np.ndarray): Mono float32 audio time series.
+        n_fft (int): FFT window length.
+        hop_length (int): Samples between successive frames.
+        
+    Returns:
+        np.ndarray: Magnitude spectrogram of shape (1 + n_fft // 2, frames).
+    """
+    # float32 in, complex64 out: half the bytes of librosa's float64 default
+    audio = np.ascontiguousarray(audio, dtype=np.float32)
+    device = _cuda_device()
+    if device is not None:
+        import torch
+        signal = torch.from_numpy(audio).to(device)
+        window = torch.hann_window(n_fft, device=device)
+        spectrum = torch.stft(signal, n_fft, hop_length=hop_length, window=window,
+                              center=True, pad_mode='constant', return_complex=True)
+        return spectrum.abs().cpu().numpy()
+    
+    with fft_backend():
+        return np.abs(librosa.stft(audio, n_fft=n_fft, hop_length=hop_length, dtype=np.complex64))
+
+
+def to_mono(audio):
+    """
+    Downmix audio to a contiguous float32 mono signal.
+    
+    Multichannel input may be laid out as (samples, channels), as returned by
+    soundfile, or (channels, samples), as returned by librosa; the shorter
+    axis is taken to be channels.
+    
+    Args:
+        audio (np.ndarray): Mono or multichannel audio.
+        
+    Returns:
+        np.ndarray: Mono float32 audio.
+    """
+    audio = np.asarray(audio)
+    if audio.ndim == 2:
+        if audio.shape[0] < audio.shape[1]:
+            audio = audio.T
+        if audio.shape[1] == 2:
+            # Stereo fast path: one add and one scale, no N x channels temporary
+            mono = np.add(audio[:, 0], audio[:, 1], dtype=np.float32)
+            mono *= 0.5
+            return mono
+        mono = audio.sum(axis=1, dtype=np.float32)
+        mono *= np.float32(1.0 / audio.shape[1])
+        return mono
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+def _dynamics_pass_numpy(audio):
+    """NumPy fallback for _dynamics_pass."""
+    cumulative = np.empty(len(audio) + 1, dtype=np.float64)
+    cumulative[0] = 0.0
+    np.cumsum(np.square(audio, dtype=np.float64), out=cumulative[1:])
+    peak = max(float(audio.max()), -float(audio.min())) if audio.size else 0.0
+    return peak, cumulative
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(cache=True)
+    def _dynamics_pass(audio):
+        """Return (peak amplitude, running sum of squares) in one sweep."""
+        cumulative = np.empty(audio.shape[0] + 1, dtype=np.float64)
+        cumulative[0] = 0.0
+        peak = 0.0
+        total = 0.0
+        for i in range(audio.shape[0]):
+            value = audio[i]
+            magnitude = abs(value)
+            if magnitude > peak:
+                peak = magnitude
+            total += value * value
+            cumulative[i + 1] = total
+        return peak, cumulative
+else:
+    _dynamics_pass = _dynamics_pass_numpy
+
+
+def framed_rms(audio, frame_length=N_FFT, hop_length=HOP_LENGTH, cumulative=None, center=True):
+    """
+    Compute per-frame RMS energy directly from the waveform.
+    
+    Uses a running sum of squares so every frame is a subtraction, rather
+    than materializing overlapping frames or an STFT.
+    
+    Args:
+        audio (np.ndarray): Mono audio time series.
+        frame_length (int): Samples per frame.
+        hop_length (int): Samples between successive frames.
+        cumulative (np.ndarray): Precomputed running sum of squares of audio
+            (length len(audio) + 1), e.g. from _dynamics_pass.
+        center (bool): Center frames on their hop positions by zero-padding
+            frame_length // 2 samples at each end, like librosa.feature.rms
+            (center=True, pad_mode='constant').
+        
+    Returns:
+        np.ndarray: RMS value of each frame.
+    """
+    if cumulative is None:
+        _, cumulative = _dynamics_pass(audio)
+    if center:
+        # Zero samples add nothing to the running sum: repeat its first
+        # value before the signal and its last value after it
+        pad = frame_length // 2
+        cumulative = np.concatenate([np.full(pad, cumulative[0]), cumulative, np.full(pad, cumulative[-1])])
+    if len(cumulative) - 1 < frame_length:
+        cumulative = np.pad(cumulative, (0, frame_length + 1 - len(cumulative)), mode='edge')
+    starts = np.arange(0, len(cumulative) - frame_length, hop_length)
+    return np.sqrt((cumulative[starts + frame_length] - cumulative[starts]) / frame_length)
+
+
 class AudioAnalyzer:
     """
     Analyzes audio data and extracts features and characteristics.
@@ -66,6 +292,9 @@ class AudioAnalyzer:
         if analysis_types is None:
             analysis_types = ['spectral', 'dynamics', 'musical', 'technical', 'recording']
         
+        # Work in contiguous float32 mono throughout; halves the bytes every pass moves
+        audio_data = to_mono(audio_data)
+        
         results = {
             "audio_info": {
                 "length_samples": len(audio_data),
@@ -74,40 +303,52 @@ class AudioAnalyzer:
             }
         }
         
+        # Compute the magnitude spectrogram once and share it between all
+        # spectral and musical features instead of letting each librosa
+        # feature run its own STFT
+        magnitude = None
+        if 'spectral' in analysis_types or 'musical' in analysis_types:
+            magnitude = stft_magnitude(audio_data)
+        
         # Spectral analysis
         if 'spectral' in analysis_types:
             spectral = {}
             
             # Calculate spectrum
-            spectrum = np.abs(librosa.stft(audio_data))
-            spectral["spectrum_shape"] = spectrum.shape
+            spectral["spectrum_shape"] = list(magnitude.shape)
             
             # Calculate spectral centroid
-            spectral_centroid = librosa.feature.spectral_centroid(y=audio_data, sr=self.sample_rate)[0]
-            spectral["centroid_mean"] = np.mean(spectral_centroid)
+            spectral_centroid = librosa.feature.spectral_centroid(S=magnitude, sr=self.sample_rate)[0]
+            spectral["centroid_mean"] = float(np.mean(spectral_centroid))
             
             # Calculate spectral bandwidth
-            spectral_bandwidth = librosa.feature.spectral_bandwidth(y=audio_data, sr=self.sample_rate)[0]
-            spectral["bandwidth_mean"] = np.mean(spectral_bandwidth)
+            spectral_bandwidth = librosa.feature.spectral_bandwidth(S=magnitude, sr=self.sample_rate)[0]
+            spectral["bandwidth_mean"] = float(np.mean(spectral_bandwidth))
             
             # Calculate spectral rolloff
-            spectral_rolloff = librosa.feature.spectral_rolloff(y=audio_data, sr=self.sample_rate)[0]
-            spectral["rolloff_mean"] = np.mean(spectral_rolloff)
+            spectral_rolloff = librosa.feature.spectral_rolloff(S=magnitude, sr=self.sample_rate)[0]
+            spectral["rolloff_mean"] = float(np.mean(spectral_rolloff))
             
             results["spectral"] = spectral
         
+        # Running sum of squares from the dynamics pass, reused by the voicing gate
+        cumulative = None
+        
         # Dynamics analysis
         if 'dynamics' in analysis_types:
             dynamics = {}
             
+            # Peak and running energy come from a single pass over the waveform
+            peak, cumulative = _dynamics_pass(audio_data)
+            
             # Calculate RMS energy
-            rms = librosa.feature.rms(y=audio_data)[0]
-            dynamics["rms_mean"] = np.mean(rms)
-            dynamics["rms_std"] = np.std(rms)
+            rms = framed_rms(audio_data, cumulative=cumulative)
+            dynamics["rms_mean"] = float(np.mean(rms))
+            dynamics["rms_std"] = float(np.std(rms))
             
             # Calculate peak levels
-            dynamics["peak_amplitude"] = np.max(np.abs(audio_data))
-            dynamics["peak_db"] = 20 * np.log10(dynamics["peak_amplitude"]) if dynamics["peak_amplitude"] > 0 else -np.inf
+            dynamics["peak_amplitude"] = float(peak)
+            dynamics["peak_db"] = float(20 * np.log10(dynamics["peak_amplitude"])) if dynamics["peak_amplitude"] > 0 else float("-inf")
             
             # Calculate crest factor
             crest_factor = dynamics["peak_amplitude"] / dynamics["rms_mean"] if dynamics["rms_mean"] > 0 else 0
@@ -119,17 +360,24 @@ class AudioAnalyzer:
         if 'musical' in analysis_types:
             musical = {}
             
-            # Calculate pitch
-            pitches, magnitudes = librosa.piptrack(y=audio_data, sr=self.sample_rate)
-            musical["pitch_mean"] = np.mean(pitches[magnitudes > 0.1]) if np.any(magnitudes > 0.1) else 0
+            # Calculate pitch: YIN gives one F0 per frame; average it over the
+            # frames that carry at least 10% of the peak frame energy
+            with fft_backend():
+                f0 = librosa.yin(audio_data, fmin=50, fmax=2000, sr=self.sample_rate,
+                                 frame_length=N_FFT, hop_length=HOP_LENGTH)
+            frame_rms = framed_rms(audio_data, cumulative=cumulative)
+            voiced = frame_rms > 0.1 * frame_rms.max()
+            musical["pitch_mean"] = float(np.mean(f0[voiced])) if np.any(voiced) else 0
             
-            # Calculate tempo
-            onset_env = librosa.onset.onset_strength(y=audio_data, sr=self.sample_rate)
-            tempo = librosa.beat.tempo(onset_envelope=onset_env, sr=self.sample_rate)[0]
-            musical["tempo"] = tempo
+            # Calculate tempo from a log-mel onset envelope built on the shared spectrum
+            power = magnitude ** 2
+            mel_db = librosa.power_to_db(mel_basis(self.sample_rate) @ power)
+            onset_env = librosa.onset.onset_strength(S=mel_db, sr=self.sample_rate)
+            tempo = librosa.feature.tempo(onset_envelope=onset_env, sr=self.sample_rate)[0]
+            musical["tempo"] = float(tempo)
             
-            # Calculate chroma features
-            chroma = librosa.feature.chroma_stft(y=audio_data, sr=self.sample_rate)
+            # Calculate chroma features (chroma expects a power spectrogram)
+            chroma = librosa.feature.chroma_stft(S=power, sr=self.sample_rate)
             musical["chroma_mean"] = np.mean(chroma, axis=1)
             
             results["musical"] = musical
@@ -165,48 +413,53 @@ class AudioAnalyzer:
         export_path = os.path.join(self.export_dir, f"{filename_prefix}_analysis.{format}")
         
         if format == 'json':
-            with open(export_path, 'w') as f:
-                json.dump(self.last_analysis, f, indent=2)
+            if orjson is not None:
+                with open(export_path, 'wb') as f:
+                    f.write(orjson.dumps(self.last_analysis,
+                                         option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2))
+            else:
+                with open(export_path, 'w') as f:
+                    json.dump(self.last_analysis, f, indent=2,
+                              default=lambda x: x.item() if isinstance(x, np.generic) else x.tolist())
                 
         elif format == 'txt':
-            with open(export_path, 'w') as f:
-                f.write("Audio Analysis Results\n")
-                f.write("=====================\n\n")
+            parts = ["Audio Analysis Results\n", "=====================\n\n"]
+            for section, data in self.last_analysis.items():
+                parts.append(f"{section.upper()}\n{'-' * len(section)}\n")
                 
-                for section, data in self.last_analysis.items():
-                    f.write(f"{section.upper()}\n")
-                    f.write("-" * len(section) + "\n")
-                    
-                    if isinstance(data, dict):
-                        for key, value in data.items():
-                            f.write(f"{key}: {value}\n")
-                    else:
-                        f.write(f"{data}\n")
-                    f.write("\n")
+                if isinstance(data, dict):
+                    parts.extend(f"{key}: {value}\n" for key, value in data.items())
+                else:
+                    parts.append(f"{data}\n")
+                parts.append("\n")
+            
+            with open(export_path, 'w') as f:
+                f.write("".join(parts))
                     
         elif format == 'html':
-            with open(export_path, 'w') as f:
-                f.write("<html><head><title>Audio Analysis Results</title>")
-                f.write("<style>body{font-family:sans-serif;max-width:800px;margin:0 auto;padding:20px}")
-                f.write("h1{color:#333}h2{color:#555}.section{margin-bottom:20px;padding:10px;background:#f8f8f8;border-radius:5px}")
-                f.write("table{width:100%;border-collapse:collapse}th,td{text-align:left;padding:8px;border-bottom:1px solid #ddd}")
-                f.write("</style></head><body>")
-                f.write("<h1>Audio Analysis Results</h1>")
+            parts = [
+                "<html><head><title>Audio Analysis Results</title>"
+                "<style>body{font-family:sans-serif;max-width:800px;margin:0 auto;padding:20px}"
+                "h1{color:#333}h2{color:#555}.section{margin-bottom:20px;padding:10px;background:#f8f8f8;border-radius:5px}"
+                "table{width:100%;border-collapse:collapse}th,td{text-align:left;padding:8px;border-bottom:1px solid #ddd}"
+                "</style></head><body>"
+                "<h1>Audio Analysis Results</h1>"
+            ]
+            for section, data in self.last_analysis.items():
+                parts.append(f"<div class='section'><h2>{section.title()}</h2>")
                 
-                for section, data in self.last_analysis.items():
-                    f.write(f"<div class='section'><h2>{section.title()}</h2>")
-                    
-                    if isinstance(data, dict):
-                        f.write("<table>")
-                        for key, value in data.items():
-                            f.write(f"<tr><td>{key}</td><td>{value}</td></tr>")
-                        f.write("</table>")
-                    else:
-                        f.write(f"<p>{data}</p>")
-                    
-                    f.write("</div>")
+                if isinstance(data, dict):
+                    parts.append("<table>")
+                    parts.extend(f"<tr><td>{key}</td><td>{value}</td></tr>" for key, value in data.items())
+                    parts.append("</table>")
+                else:
+                    parts.append(f"<p>{data}</p>")
                 
-                f.write("</body></html>")
+                parts.append("</div>")
+            parts.append("</body></html>")
+            
+            with open(export_path, 'w') as f:
+                f.write("".join(parts))
         
         else:
             raise ValueError(f"Unsupported export format: {format}")